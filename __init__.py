@@ -1,25 +1,51 @@
 from .gladia_api import (
     transcribe_audio,
+    transcribe_many,
+    iter_transcriptions,
+    transcribe_directory,
     upload_audio,
     request_transcription,
     check_transcription_status,
     find_in_dict,
+    estimate_audio_duration,
+    get_poller,
+    TranscriptionPoller,
     API_KEY,
     UPLOAD_URL,
     TRANSCRIPTION_URL,
     POLL_INTERVAL,
-    MAX_RETRIES
+    MAX_RETRIES,
+    TRANSCRIPTION_TIMEOUT
+)
+from .gladia_async import (
+    transcribe_audio_async,
+    transcribe_many_async,
+    upload_audio_async,
+    request_transcription_async,
+    check_transcription_status_async
 )
 
 __all__ = [
     'transcribe_audio',
+    'transcribe_many',
+    'iter_transcriptions',
+    'transcribe_directory',
     'upload_audio',
     'request_transcription',
     'check_transcription_status',
     'find_in_dict',
+    'transcribe_audio_async',
+    'transcribe_many_async',
+    'upload_audio_async',
+    'request_transcription_async',
+    'check_transcription_status_async',
+    'estimate_audio_duration',
+    'get_poller',
+    'TranscriptionPoller',
     'API_KEY',
     'UPLOAD_URL',
     'TRANSCRIPTION_URL',
     'POLL_INTERVAL',
-    'MAX_RETRIES'
+    'MAX_RETRIES',
+    'TRANSCRIPTION_TIMEOUT'
 ]
\ No newline at end of file
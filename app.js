@@ -5,6 +5,7 @@ document.addEventListener('DOMContentLoaded', function() {
     const sourceLanguageSelect = document.getElementById('sourceLanguage');
     const startRecordingBtn = document.getElementById('startRecording');
     const stopRecordingBtn = document.getElementById('stopRecording');
+    const liveModeBtn = document.getElementById('liveMode');
     const recordingProgress = document.getElementById('recordingProgress');
     const textInput = document.getElementById('textInput');
     const sendTextBtn = document.getElementById('sendText');
@@ -123,6 +124,13 @@ document.addEventListener('DOMContentLoaded', function() {
     let recordingTimer;
     let progressTimer;
 
+    // Live (streaming) mode variables
+    const LIVE_SAMPLE_RATE = 16000;
+    let liveSocket = null;
+    let liveAudioContext = null;
+    let liveProcessor = null;
+    let liveStream = null;
+
     // Initialize by loading characters
     loadCharacters();
 
@@ -132,6 +140,9 @@ document.addEventListener('DOMContentLoaded', function() {
     // Set up event listeners
     startRecordingBtn.addEventListener('click', startRecording);
     stopRecordingBtn.addEventListener('click', stopRecording);
+    if (liveModeBtn) {
+        liveModeBtn.addEventListener('click', () => liveSocket ? stopLiveSession() : startLiveSession());
+    }
     sendTextBtn.addEventListener('click', sendTextMessage);
     
     // Set up character select dropdown if it exists
@@ -771,30 +782,22 @@ document.addEventListener('DOMContentLoaded', function() {
             formData.append('api_version', charData.api || '1');
         }
         
-        fetch('/process_audio', {
+        fetch('/process_audio_stream', {
             method: 'POST',
             body: formData
         })
-        .then(response => response.json())
-        .then(data => {
-            // Reset the progress bar
-            recordingProgress.style.width = '0%';
-            recordingProgress.setAttribute('aria-valuenow', 0);
-            recordingProgress.textContent = '';
-            
-            if (data.success) {
-                displayResponse(data);
-            } else {
-                console.error('Error processing audio:', data.error);
-                showError('Error processing audio: ' + data.error);
-                responseText.innerHTML = `<p class="text-danger">Error: ${data.error}</p>`;
+        .then(response => {
+            if (!response.ok || !response.body) {
+                return response.json().then(data => { throw new Error(data.error || 'Request failed'); });
             }
+            return readEventStream(response.body, handleStreamEvent);
         })
         .catch(error => {
             console.error('Error:', error);
             showError('An error occurred while processing your audio.');
             responseText.innerHTML = '<p class="text-danger">An error occurred while processing your audio.</p>';
-            
+        })
+        .finally(() => {
             // Reset the progress bar
             recordingProgress.style.width = '0%';
             recordingProgress.setAttribute('aria-valuenow', 0);
@@ -802,6 +805,168 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    // Read a newline-delimited JSON stream and pass each event to the handler as it arrives
+    async function readEventStream(body, onEvent) {
+        const reader = body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let newline;
+            while ((newline = buffer.indexOf('\n')) >= 0) {
+                const line = buffer.slice(0, newline).trim();
+                buffer = buffer.slice(newline + 1);
+                if (line) onEvent(JSON.parse(line));
+            }
+        }
+        if (buffer.trim()) onEvent(JSON.parse(buffer));
+    }
+
+    // Streamed reply: show text progressively and play audio segments back to back
+    let segmentQueue = [];
+    let streamedText = [];
+
+    function handleStreamEvent(event) {
+        if (event.type === 'transcript') {
+            segmentQueue = [];
+            streamedText = [];
+            responseText.innerHTML = `<p><strong>You said:</strong> ${event.text}</p><p><strong>Response:</strong> <span id="streamedResponse"></span></p>`;
+        } else if (event.type === 'segment') {
+            streamedText.push(event.text);
+            const target = document.getElementById('streamedResponse');
+            if (target) target.textContent = streamedText.join(' ');
+            if (event.audio_file) enqueueSegment(event.audio_file);
+        } else if (event.type === 'error') {
+            console.error('Error processing audio:', event.error);
+            showError('Error processing audio: ' + event.error);
+            responseText.innerHTML = `<p class="text-danger">Error: ${event.error}</p>`;
+        }
+    }
+
+    function enqueueSegment(audioFile) {
+        segmentQueue.push(audioFile);
+        if (audioResponse.paused || audioResponse.ended) playNextSegment();
+    }
+
+    function playNextSegment() {
+        const next = segmentQueue.shift();
+        if (!next) return;
+        audioResponse.src = next;
+        audioPlayer.style.display = 'block';
+        audioResponse.play();
+    }
+
+    audioResponse.addEventListener('ended', playNextSegment);
+
+    // Function to start live mode: stream 16 kHz PCM over a WebSocket and receive transcripts/replies
+    async function startLiveSession() {
+        if (!selectedCharacter || !selectedLanguage) {
+            showError('Please select a character and language first.');
+            return;
+        }
+
+        try {
+            liveStream = await navigator.mediaDevices.getUserMedia({ audio: true });
+        } catch (e) {
+            showError('Could not access the microphone: ' + e.message);
+            return;
+        }
+
+        const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+        liveSocket = new WebSocket(`${protocol}//${window.location.host}/ws/live`);
+        liveSocket.binaryType = 'arraybuffer';
+
+        liveSocket.onopen = () => {
+            liveSocket.send(JSON.stringify({
+                language: selectedLanguage,
+                character: selectedCharacter,
+                sample_rate: LIVE_SAMPLE_RATE
+            }));
+        };
+
+        liveSocket.onmessage = (event) => {
+            const message = JSON.parse(event.data);
+            if (message.type === 'ready') {
+                startLiveCapture();
+                responseText.innerHTML = '<p class="text-center"><i>Listening...</i></p>';
+            } else if (message.type === 'partial' || message.type === 'final') {
+                responseText.innerHTML = `<p><strong>You said:</strong> ${message.text}${message.type === 'partial' ? '…' : ''}</p>`;
+            } else if (message.type === 'processing') {
+                responseText.innerHTML = `<p><strong>You said:</strong> ${message.text}</p><p><i>Thinking...</i></p>`;
+            } else if (message.type === 'response') {
+                if (message.success) {
+                    displayResponse(message);
+                } else {
+                    showError('Error processing audio: ' + message.error);
+                }
+            } else if (message.type === 'error') {
+                showError('Live mode error: ' + message.error);
+                stopLiveSession();
+            }
+        };
+
+        liveSocket.onclose = () => {
+            cleanupLiveSession();
+        };
+
+        liveModeBtn.textContent = 'Stop Live Conversation';
+        liveModeBtn.classList.add('recording');
+        startRecordingBtn.disabled = true;
+    }
+
+    // Capture microphone audio, downmix/convert to 16-bit PCM and send it as binary frames
+    function startLiveCapture() {
+        window.AudioContext = window.AudioContext || window.webkitAudioContext;
+        liveAudioContext = new AudioContext({ sampleRate: LIVE_SAMPLE_RATE });
+        const source = liveAudioContext.createMediaStreamSource(liveStream);
+        liveProcessor = liveAudioContext.createScriptProcessor(4096, 1, 1);
+
+        liveProcessor.onaudioprocess = (e) => {
+            if (!liveSocket || liveSocket.readyState !== WebSocket.OPEN) return;
+            const samples = e.inputBuffer.getChannelData(0);
+            const pcm = new Int16Array(samples.length);
+            for (let i = 0; i < samples.length; i++) {
+                const s = Math.max(-1, Math.min(1, samples[i]));
+                pcm[i] = s < 0 ? s * 0x8000 : s * 0x7FFF;
+            }
+            liveSocket.send(pcm.buffer);
+        };
+
+        source.connect(liveProcessor);
+        liveProcessor.connect(liveAudioContext.destination);
+    }
+
+    // Function to stop live mode; the server flushes and answers the last utterance before closing
+    function stopLiveSession() {
+        if (liveProcessor) {
+            liveProcessor.disconnect();
+            liveProcessor = null;
+        }
+        if (liveSocket && liveSocket.readyState === WebSocket.OPEN) {
+            liveSocket.send(JSON.stringify({ type: 'stop' }));
+        }
+        if (liveStream) {
+            liveStream.getTracks().forEach(track => track.stop());
+            liveStream = null;
+        }
+        liveModeBtn.textContent = 'Start Live Conversation';
+        liveModeBtn.classList.remove('recording');
+        startRecordingBtn.disabled = false;
+    }
+
+    function cleanupLiveSession() {
+        if (liveAudioContext) {
+            liveAudioContext.close();
+            liveAudioContext = null;
+        }
+        if (liveSocket) {
+            stopLiveSession();
+            liveSocket = null;
+        }
+    }
+
     // Function to send text message with improved display
     function sendTextMessage() {
         const text = textInput.value.trim();
@@ -1,18 +1,25 @@
-from flask import Flask, request, jsonify, render_template, send_file, session, redirect, url_for, flash
+from flask import Flask, Response, request, jsonify, render_template, send_file, session, redirect, url_for, flash
 from system import IntegratedVoiceSystem
 import os
+import hmac
 import time
 import logging
 from dotenv import load_dotenv
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from flask_sock import Sock
 from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.security import generate_password_hash, check_password_hash
 from functools import wraps
 import sqlite3
 import json
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from authentication import login_user, register_user, reset_password
+from gladia_api import handle_callback
+from http_client import get_http_pool
+from streaming_stt import LiveTranscriptionSession, STREAM_SAMPLE_RATE
+import threading
 
 # Load environment variables
 load_dotenv()
@@ -34,6 +41,9 @@ app.config['PERMANENT_SESSION_LIFETIME'] = 86400 * 30  # 30 days in seconds
 # Handle reverse proxies
 app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1)
 
+# WebSocket support for live transcription
+sock = Sock(app)
+
 # Setup rate limiting
 limiter = Limiter(
     get_remote_address,
@@ -46,6 +56,12 @@ limiter = Limiter(
 AUDIO_OUTPUT_DIR = os.getenv('AUDIO_OUTPUT_DIR', 'audio_outputs')
 os.makedirs(AUDIO_OUTPUT_DIR, exist_ok=True)
 
+# Shared secret expected on Gladia completion callbacks (?token=...); without it every callback is rejected
+GLADIA_CALLBACK_SECRET = os.getenv('GLADIA_CALLBACK_SECRET')
+
+# Bearer token for monitoring scrapers on /metrics; without it only logged-in users can read metrics
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
 # Get Google API key
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 if not GOOGLE_API_KEY:
@@ -107,6 +123,12 @@ def ensure_session_id():
     if 'session_id' not in session:
         session['session_id'] = str(uuid.uuid4())
 
+def conversation_key():
+    """Key for the caller's conversation history: the logged-in user, else the browser session"""
+    if 'user_id' in session:
+        return f"user:{session['user_id']}"
+    return f"session:{session['session_id']}"
+
 # Routes for authentication
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -310,8 +332,11 @@ def process_audio():
         target_language = request.form.get('language', 'English')
         character = request.form.get('character', 'Monika')
         
+        # Optional pipeline mode: "translate" (default) or "direct"
+        pipeline = request.form.get('pipeline')
+        
         # Process the audio
-        result = voice_system.process_audio_sync(temp_file_path, target_language, character)
+        result = voice_system.process_audio_sync(temp_file_path, target_language, character, conversation_key(), pipeline)
         return jsonify(result)
     except Exception as e:
         logger.error(f"Error in process_audio: {str(e)}", exc_info=True)
@@ -324,6 +349,54 @@ def process_audio():
             except Exception as e:
                 logger.warning(f"Failed to remove temporary file: {e}")
 
+@app.route('/process_audio_stream', methods=['POST'])
+@login_required
+@limiter.limit("10 per minute")
+def process_audio_stream():
+    """Process audio and stream the reply as newline-delimited JSON events, one audio segment per sentence"""
+    if 'audio' not in request.files:
+        return jsonify({'success': False, 'error': 'No audio file uploaded'}), 400
+        
+    audio_file = request.files['audio']
+    if audio_file.filename == '':
+        return jsonify({'success': False, 'error': 'No selected file'}), 400
+        
+    # Security check for file type
+    if not audio_file.filename.lower().endswith(('.wav', '.mp3', '.ogg')):
+        return jsonify({'success': False, 'error': 'Invalid file format'}), 400
+    
+    timestamp = int(time.time())
+    session_id = session.get('session_id', 'unknown')
+    temp_file_path = f"temp_{session_id}_{timestamp}.wav"
+    audio_file.save(temp_file_path)
+    
+    target_language = request.form.get('language', 'English')
+    character = request.form.get('character', 'Monika')
+    pipeline = request.form.get('pipeline')
+    # Resolved here: the Flask session is not available once the response starts streaming
+    session_key = conversation_key()
+    
+    def remove_temp_file():
+        if os.path.exists(temp_file_path):
+            try:
+                os.remove(temp_file_path)
+            except Exception as e:
+                logger.warning(f"Failed to remove temporary file: {e}")
+    
+    def generate():
+        try:
+            for event in voice_system.process_audio_stream(temp_file_path, target_language, character,
+                                                           session_key, pipeline):
+                yield json.dumps(event) + "\n"
+        finally:
+            # Clean up the temporary file once the stream is finished
+            remove_temp_file()
+    
+    response = Response(generate(), mimetype='application/x-ndjson')
+    # Also runs when the client disconnects before the generator is ever started
+    response.call_on_close(remove_temp_file)
+    return response
+
 @app.route('/process_text', methods=['POST'])
 @login_required
 @limiter.limit("20 per minute")
@@ -338,17 +411,106 @@ def process_text():
         source_language = data.get('source_language', 'English')
         target_language = data.get('target_language', 'English')
         character = data.get('character', 'Monika')
+        pipeline = data.get('pipeline')
         
         if not text:
             return jsonify({"success": False, "error": "Text is required"}), 400
         
         # Process the text
-        result = voice_system.process_text_input(text, source_language, target_language, character)
+        result = voice_system.process_text_input(text, source_language, target_language, character,
+                                                 conversation_key(), pipeline)
         return jsonify(result)
     except Exception as e:
         logger.error(f"Error in process_text: {str(e)}")
         return jsonify({"success": False, "error": str(e)}), 500
 
+@sock.route('/ws/live')
+def live_transcription(ws):
+    """
+    Live voice mode: the browser streams 16-bit mono PCM frames, partial and final
+    transcripts are pushed back, and each final transcript is answered immediately.
+    
+    Protocol: the first text message is a JSON config
+    ({"language", "character", "sample_rate", "pipeline"}); binary messages are audio;
+    {"type": "stop"} ends the stream.
+    """
+    if 'user_id' not in session:
+        ws.send(json.dumps({"type": "error", "error": "Authentication required"}))
+        return
+    session_key = conversation_key()
+    
+    send_lock = threading.Lock()
+    
+    def send_event(event):
+        # Transcripts arrive on the backend's reader thread; serialize socket writes
+        with send_lock:
+            ws.send(json.dumps(event))
+    
+    def answer(final):
+        try:
+            send_event({"type": "processing", "text": final.text})
+            result = voice_system.process_transcript_sync(final.text, final.language, target_language, character,
+                                                          session_key, pipeline)
+            send_event({"type": "response", **result})
+        except Exception as e:
+            logger.error(f"Error answering live transcript: {str(e)}", exc_info=True)
+            try:
+                send_event({"type": "error", "error": str(e)})
+            except Exception:
+                pass
+    
+    try:
+        config = json.loads(ws.receive(timeout=10) or '{}')
+    except (ValueError, TypeError):
+        config = None
+    if not isinstance(config, dict):
+        send_event({"type": "error", "error": "Expected a JSON config message"})
+        return
+    target_language = config.get('language', 'English')
+    character = config.get('character', 'Monika')
+    pipeline = config.get('pipeline')
+    
+    live_session = LiveTranscriptionSession(send_event)
+    # Answers (LLM + TTS) run off the receive loop so audio keeps flowing to the backend;
+    # one worker keeps them in order, since they share the conversation history
+    answers = ThreadPoolExecutor(max_workers=1, thread_name_prefix="live-answer")
+    finished = False
+    try:
+        live_session.start(sample_rate=int(config.get('sample_rate', STREAM_SAMPLE_RATE)))
+        send_event({"type": "ready"})
+        
+        while True:
+            message = ws.receive(timeout=0.05)
+            if isinstance(message, (bytes, bytearray)):
+                live_session.send_audio(bytes(message))
+            elif message:
+                control = json.loads(message)
+                if isinstance(control, dict) and control.get('type') == 'stop':
+                    live_session.finish()
+                    break
+            
+            # Start the assistant as soon as the backend finalizes an utterance
+            final = live_session.next_final()
+            if final:
+                answers.submit(answer, final)
+        
+        # Answer whatever was finalized while the stream was being flushed
+        final = live_session.next_final()
+        while final:
+            answers.submit(answer, final)
+            final = live_session.next_final()
+        finished = True
+    except Exception as e:
+        logger.error(f"Error in live transcription: {str(e)}", exc_info=True)
+        try:
+            send_event({"type": "error", "error": str(e)})
+        except Exception:
+            pass
+    finally:
+        # After a clean stop, let queued answers reach the client before the socket closes
+        answers.shutdown(wait=finished, cancel_futures=not finished)
+        live_session.close()
+
 @app.route('/generate_speech', methods=['POST'])
 @login_required
 @limiter.limit("20 per minute")
@@ -407,11 +569,39 @@ def record_audio_page():
     """Render the audio recording page"""
     return render_template('record.html')
 
+@app.route('/gladia/callback', methods=['POST'])
+@limiter.exempt
+def gladia_callback():
+    """Receive a Gladia transcription completion callback and wake the waiting request"""
+    token = request.args.get('token', '')
+    if not GLADIA_CALLBACK_SECRET or not hmac.compare_digest(token.encode(), GLADIA_CALLBACK_SECRET.encode()):
+        logger.warning("Rejected Gladia callback with invalid token")
+        return jsonify({"success": False, "error": "Forbidden"}), 403
+    
+    job_id = handle_callback(request.get_json(silent=True))
+    if not job_id:
+        return jsonify({"success": False, "error": "Invalid callback payload"}), 400
+    return jsonify({"success": True, "id": job_id})
+
 @app.route('/health')
 def health_check():
     """Health check endpoint for monitoring"""
     return jsonify({"status": "healthy", "timestamp": time.time()})
 
+@app.route('/metrics')
+def metrics():
+    """Runtime counters for monitoring (logged-in session or METRICS_TOKEN bearer token)"""
+    if 'user_id' not in session:
+        auth = request.headers.get('Authorization', '')
+        token = auth[len('Bearer '):] if auth.startswith('Bearer ') else ''
+        if not METRICS_TOKEN or not hmac.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+            return jsonify({"error": "Authentication required"}), 401
+    return jsonify({
+        "http_pools": get_http_pool().stats(),
+        **voice_system.get_metrics(),
+        "timestamp": time.time()
+    })
+
 @app.route('/get_characters', methods=['GET'])
 def get_characters():
     try:
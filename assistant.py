@@ -1,13 +1,30 @@
 import uuid
 import time
+import datetime
+import hashlib
 import os
 import logging
-from typing import Dict, List, Optional, Tuple, Any
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Any
 import google.generativeai as genai
+from google.generativeai import caching
 from googletrans import Translator
 
-# Import the Gladia API functions
-from gladia_api import transcribe_audio
+# Speech-to-text backends (Gladia plus optional local engine)
+from speech_backends import SpeechRouter
+from cache import TieredCache, CACHE_DB_PATH, sha256_file
+from audio_preprocessing import AudioPreprocessor
+from sentence_stream import iter_sentences
+from metrics import LatencyStats
+from conversation_store import ConversationStore, EXPIRY_SLICE, MAX_READ_MESSAGES, create_conversation_store
+from response_cache import SemanticResponseCache, RESPONSE_CACHE_ENABLED
+from language_id import LocalLanguageIdentifier, LANGID_CONFIDENCE_THRESHOLD
+from resilience import CircuitBreaker, CircuitOpenError, ResilientCaller
+from model_router import ModelRouter, MODEL_ROUTING_ENABLED, FAST_MODEL
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -57,95 +74,205 @@ Response: "Sure! Think of blockchain as a digital ledger, like a notebook, that
 Stay engaging, helpful, and intuitive while ensuring smooth and natural conversation flow.
 """
 
+# History sent to the model (excluding the character profile) is kept under this many tokens
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", 1500))
+MIN_RECENT_MESSAGES = 2  # the latest exchange is always kept, whatever its size
+SESSION_EXPIRY_INTERVAL = float(os.getenv("SESSION_EXPIRY_INTERVAL", 1))  # seconds between expiry slices
+
+# Turns that fall out of the budget are folded into a rolling summary by a cheaper model
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "gemini-1.5-flash")
+SUMMARY_MAX_TOKENS = 200
+SUMMARY_PROMPT = """Update the running summary of a conversation between a user and a voice assistant.
+Keep names, facts, preferences and open questions; drop small talk. Answer with the summary only, in under 120 words.
+
+Current summary:
+{previous}
+
+New messages:
+{transcript}"""
+
+# Maximum concurrent requests to Gemini per ModelHandler; further callers wait for a slot
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", 8))
+
+# Provider-side context caching only accepts prefixes of at least this many tokens
+CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("CONTEXT_CACHE_MIN_TOKENS", 32768))
+CONTEXT_CACHE_TTL = 3600  # seconds
+
+# Pipeline modes: "translate" runs translate -> English model turn -> translate back;
+# "direct" sends the original text and has the model answer in the target language
+PIPELINE_TRANSLATE = "translate"
+PIPELINE_DIRECT = "direct"
+PIPELINE_MODES = (PIPELINE_TRANSLATE, PIPELINE_DIRECT)
+DEFAULT_PIPELINE = os.getenv("ASSISTANT_PIPELINE", PIPELINE_TRANSLATE)
+DIRECT_REPLY_INSTRUCTION = "Always reply in {language}, whatever language the user writes in."
+
+Summarizer = Callable[[List[Dict[str, str]], Optional[str]], str]
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate (~4 characters per token for English text)"""
+    return len(text) // 4 + 1
+
 class ConversationManager:
-    def __init__(self, session_timeout: int = 3600):
-        self.sessions: Dict[str, Dict[str, Any]] = {}  # Dictionary to store conversation sessions
+    def __init__(self, session_timeout: int = 3600, max_sessions: int = 10000,
+                 token_budget: int = HISTORY_TOKEN_BUDGET, summarizer: Optional[Summarizer] = None,
+                 profile: str = CHARACTER_PROFILE, store: Optional[ConversationStore] = None):
         self.session_timeout = session_timeout  # Session timeout in seconds
+        self.max_sessions = max_sessions  # Hard cap; least recently active sessions are evicted first
+        # Messages and session metadata live in a pluggable store (in-process or shared SQLite)
+        self.store = store if store is not None else create_conversation_store(max_sessions=max_sessions)
+        self.token_budget = token_budget
+        self.profile = profile  # one shared string, prepended to every conversation on read
+        # summarizer(dropped_messages, previous_summary) -> new summary; without one, dropped turns are discarded
+        self.summarizer = summarizer
+        self._summary_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-summary")
+        # Trimmed turns waiting to be folded into each session's summary (process-local)
+        self._unsummarized: Dict[str, List[Dict[str, str]]] = {}
+        self._lock = threading.Lock()
     
-    def create_session(self) -> str:
-        """Create a new conversation session with unique ID"""
-        session_id = str(uuid.uuid4())
-        self.sessions[session_id] = {
-            "conversation": [
-                {"role": "system", "content": CHARACTER_PROFILE}
-            ],
-            "source_language": None,
-            "last_activity": time.time()
-        }
+    def create_session(self, session_id: Optional[str] = None) -> str:
+        """Create a new conversation session, with a unique ID unless one is given"""
+        session_id = session_id or str(uuid.uuid4())
+        self.store.create(session_id)
+        return session_id
+    
+    def get_or_create_session(self, session_id: str) -> str:
+        """Return the session for a caller-provided key (e.g. the Flask session), creating it if needed"""
+        if not self.store.touch(session_id):
+            self.store.create(session_id)
         return session_id
     
     def add_message(self, session_id: str, role: str, content: str) -> bool:
         """Add a message to the conversation history"""
-        if session_id not in self.sessions:
+        if not self.store.append(session_id, role, content):
             logger.warning(f"Attempted to add message to non-existent session: {session_id}")
             return False
-            
-        self.sessions[session_id]["conversation"].append({
-            "role": role,
-            "content": content
-        })
-        self.sessions[session_id]["last_activity"] = time.time()
         return True
     
     def get_conversation(self, session_id: str) -> Optional[List[Dict[str, str]]]:
-        """Get the full conversation history"""
-        if session_id not in self.sessions:
+        """Get the conversation history: profile, rolling summary (if any), then the newest messages"""
+        window = self.store.messages(session_id)
+        meta = self.store.get_meta(session_id) if window is not None else None
+        if window is None or meta is None:
             logger.warning(f"Attempted to get conversation from non-existent session: {session_id}")
             return None
-        return self.sessions[session_id]["conversation"]
+        
+        conversation = [{"role": "system", "content": self.profile}]
+        if meta["summary"]:
+            conversation.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation: {meta['summary']}"
+            })
+        conversation.extend(window[1])
+        return conversation
     
     def set_language(self, session_id: str, language_code: str) -> bool:
         """Set the source language for this session"""
-        if session_id not in self.sessions:
+        if not self.store.set_meta(session_id, source_language=language_code):
             logger.warning(f"Attempted to set language for non-existent session: {session_id}")
             return False
-        self.sessions[session_id]["source_language"] = language_code
         return True
     
     def get_language(self, session_id: str) -> Optional[str]:
         """Get the source language for this session"""
-        if session_id not in self.sessions:
+        meta = self.store.get_meta(session_id)
+        if meta is None:
             logger.warning(f"Attempted to get language from non-existent session: {session_id}")
             return None
-        return self.sessions[session_id]["source_language"]
+        return meta["source_language"]
     
-    def trim_conversation(self, session_id: str, max_messages: int = 10) -> bool:
-        """Trim conversation history to prevent token limits"""
-        if session_id not in self.sessions:
+    def trim_conversation(self, session_id: str, max_tokens: Optional[int] = None) -> bool:
+        """
+        Keep the newest turns that fit in the token budget and in the
+        MAX_READ_MESSAGES window get_conversation() reads.
+        
+        Older turns are removed from the history and, when a summarizer is
+        configured, folded into the session's rolling summary in the background,
+        so the request path never waits for summarization.
+        """
+        budget = max_tokens or self.token_budget
+        # Every live message, not just the read window, so no turn leaves the context unsummarized
+        window = self.store.messages(session_id, limit=None)
+        if window is None:
             logger.warning(f"Attempted to trim non-existent session: {session_id}")
             return False
-            
-        conversation = self.sessions[session_id]["conversation"]
-        if len(conversation) > (max_messages * 2 + 1):
-            system_message = conversation[0]
-            recent_messages = conversation[-(max_messages * 2):]
-            self.sessions[session_id]["conversation"] = [system_message] + recent_messages
-            logger.info(f"Trimmed conversation history for session {session_id}")
-        return True
-    
-    def cleanup_expired_sessions(self) -> int:
-        """Remove expired sessions to prevent memory leaks"""
-        current_time = time.time()
-        expired_sessions = []
         
-        for session_id, session_data in self.sessions.items():
-            if current_time - session_data["last_activity"] > self.session_timeout:
-                expired_sessions.append(session_id)
+        first_seq, messages = window
+        # Walk back from the newest message until the budget is used up
+        cut = len(messages)
+        tokens = 0
+        for index in range(len(messages) - 1, -1, -1):
+            tokens += estimate_tokens(messages[index]["content"])
+            if tokens > budget and len(messages) - index > MIN_RECENT_MESSAGES:
+                break
+            cut = index
+        # Many short turns can fit the budget but not the read window; the model would never see the overflow
+        cut = max(cut, len(messages) - MAX_READ_MESSAGES)
+        # The kept history has to start with a user turn
+        while cut < len(messages) - 1 and messages[cut]["role"] != "user":
+            cut += 1
         
-        for session_id in expired_sessions:
-            del self.sessions[session_id]
+        dropped = messages[:cut]
+        if dropped:
+            self.store.trim_before(session_id, first_seq + cut)
+            logger.info(f"Trimmed {len(dropped)} messages from session {session_id}")
+            if self.summarizer is not None:
+                with self._lock:
+                    start_job = session_id not in self._unsummarized
+                    self._unsummarized.setdefault(session_id, []).extend(dropped)
+                if start_job:
+                    self._summary_executor.submit(self._update_summary, session_id)
+        return True
+    
+    def _update_summary(self, session_id: str) -> None:
+        """Fold trimmed turns into the rolling summary (runs on the summary thread)"""
+        while True:
+            with self._lock:
+                pending = list(self._unsummarized.get(session_id, ()))
+            meta = self.store.get_meta(session_id)
+            
+            summary = None
+            if meta is not None and pending:
+                try:
+                    summary = self.summarizer(pending, meta["summary"])
+                except Exception as e:
+                    logger.error(f"Error summarizing session {session_id}: {e}")
+            if summary:
+                self.store.set_meta(session_id, summary=summary)
+            
+            with self._lock:
+                # Turns that could not be summarized are dropped, as plain trimming would
+                remaining = self._unsummarized.get(session_id, [])
+                del remaining[:len(pending)]
+                if meta is None or not remaining:
+                    self._unsummarized.pop(session_id, None)
+                    return
+    
+    def cleanup_expired_sessions(self, limit: Optional[int] = None) -> int:
+        """Remove up to limit (default: all) expired sessions to prevent memory leaks"""
+        expired = self.store.expire(self.session_timeout, limit)
         
-        if expired_sessions:
-            logger.info(f"Cleaned up {len(expired_sessions)} expired sessions")
+        if expired:
+            logger.info(f"Cleaned up {expired} expired sessions")
             
-        return len(expired_sessions)
+        return expired
 
 class GladiaSpeechHandler:
-    """Updated speech handler that uses Gladia API for speech-to-text conversion"""
+    """Speech handler that routes speech-to-text between Gladia and a local CPU engine"""
+    
+    def __init__(self, cache: Optional[TieredCache] = None, router: Optional[SpeechRouter] = None):
+        self.router = router or SpeechRouter()
+        # Transcripts keyed by the SHA-256 of the audio bytes, so resent recordings skip Gladia
+        self.cache = cache if cache is not None else TieredCache(
+            "transcriptions",
+            max_entries=int(os.getenv("TRANSCRIPTION_CACHE_SIZE", 512)),
+            ttl=float(os.getenv("TRANSCRIPTION_CACHE_TTL", 7 * 86400)),
+            db_path=CACHE_DB_PATH
+        )
     
     def recognize_audio(self, audio_path: str) -> Tuple[str, Optional[str]]:
         """
-        Convert audio file to text using Gladia API
+        Convert audio file to text (Gladia API or the local fallback engine)
         
         Returns:
             Tuple[str, Optional[str]]: (transcribed_text, detected_language)
@@ -155,40 +282,128 @@ class GladiaSpeechHandler:
             return "Audio file not found", None
             
         try:
-            # Use Gladia API to transcribe audio
-            transcript, detected_language = transcribe_audio(audio_path)
+            audio_hash = sha256_file(audio_path)
+            cached = self.cache.get(audio_hash)
+            if cached is not None:
+                logger.info(f"Transcription cache hit for audio {audio_hash[:12]}")
+                return cached[0], cached[1]
+            
+            # Transcribe with whichever backend the router picks for this clip
+            transcript, detected_language = self.router.transcribe(audio_path)
             
             if transcript:
                 logger.info(f"Successfully transcribed audio: {transcript[:50]}...")
                 logger.info(f"Detected language: {detected_language}")
+                self.cache.set(audio_hash, [transcript, detected_language])
                 return transcript, detected_language
             else:
                 logger.warning("Could not transcribe audio")
                 return "Could not understand audio", None
                 
         except Exception as e:
-            logger.error(f"Error processing audio file with Gladia API: {e}")
+            logger.error(f"Error processing audio file: {e}")
             return f"Error processing audio file: {e}", None
 
 class TranslationHandler:
-    def __init__(self, retry_attempts: int = 3):
+    def __init__(self, retry_attempts: int = 3, cache: Optional[TieredCache] = None,
+                 language_identifier: Optional[LocalLanguageIdentifier] = None):
         self.translator = Translator()
         self.retry_attempts = retry_attempts
+        # All googletrans calls share one breaker (fail fast while it is down); hedging at p95 is opt-in
+        self.upstream = ResilientCaller(
+            "googletrans",
+            CircuitBreaker("googletrans", failure_threshold=5, reset_timeout=30),
+            hedge=os.getenv("TRANSLATION_HEDGING", "false").lower() == "true"
+        )
+        # Offline language ID; the remote detector is only asked when it is unsure
+        self.language_identifier = language_identifier or LocalLanguageIdentifier()
+        self._detections = {"local": 0, "remote": 0, "english_skips": 0}
+        self._detections_lock = threading.Lock()
+        # Translations keyed by (text, src, dest); canned and repeated replies skip googletrans
+        self.cache = cache if cache is not None else TieredCache(
+            "translations",
+            max_entries=int(os.getenv("TRANSLATION_CACHE_SIZE", 4096)),
+            ttl=float(os.getenv("TRANSLATION_CACHE_TTL", 7 * 86400)),
+            db_path=CACHE_DB_PATH if os.getenv("TRANSLATION_CACHE_DISK", "true").lower() == "true" else None
+        )
+    
+    @staticmethod
+    def _cache_key(text: str, source_language: Optional[str], target_language: str) -> str:
+        raw = f"{source_language or 'auto'}\x00{target_language.lower()}\x00{text}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    def _translate(self, text: str, source_language: Optional[str], target_language: str,
+                   use_cache: bool = True) -> Optional[str]:
+        """Translate through the cache; returns None if every attempt failed"""
+        key = self._cache_key(text, source_language, target_language)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        for attempt in range(self.retry_attempts):
+            try:
+                if source_language:
+                    translation = self.upstream.call(self.translator.translate, text,
+                                                     src=source_language, dest=target_language)
+                else:
+                    translation = self.upstream.call(self.translator.translate, text, dest=target_language)
+                if use_cache:
+                    self.cache.set(key, translation.text)
+                return translation.text
+            except CircuitOpenError:
+                logger.warning(f"Translation upstream unavailable; skipping translation to {target_language}")
+                return None
+            except Exception as e:
+                logger.warning(f"Translation to {target_language} error (attempt {attempt+1}/{self.retry_attempts}): {e}")
+                if attempt + 1 < self.retry_attempts:
+                    time.sleep(1)  # Wait before retry
+        return None
+    
+    def _count_detection(self, outcome: str) -> None:
+        with self._detections_lock:
+            self._detections[outcome] += 1
+    
+    def detection_stats(self) -> Dict[str, int]:
+        with self._detections_lock:
+            return dict(self._detections)
+    
+    def _identify_locally(self, text: str) -> Optional[str]:
+        """Language code from the offline identifier if it is confident enough, else None"""
+        guess = self.language_identifier.identify(text)
+        if guess is None:
+            return None
+        language, confidence = guess
+        if confidence < LANGID_CONFIDENCE_THRESHOLD:
+            logger.info(f"Low-confidence local language guess '{language}' ({confidence:.2f})")
+            return None
+        return language
     
     def detect_language(self, text: str) -> str:
         """Detect the language of the input text"""
         if not text or text.isspace():
             logger.warning("Empty text provided for language detection")
             return 'en'  # Default to English
-            
+        
+        language = self._identify_locally(text)
+        if language:
+            self._count_detection("local")
+            logger.info(f"Detected language locally: {language}")
+            return language
+        
+        self._count_detection("remote")
         for attempt in range(self.retry_attempts):
             try:
-                detection = self.translator.detect(text)
+                detection = self.upstream.call(self.translator.detect, text)
                 logger.info(f"Detected language: {detection.lang} (confidence: {detection.confidence})")
                 return detection.lang
+            except CircuitOpenError:
+                logger.warning("Language detection upstream unavailable")
+                break
             except Exception as e:
                 logger.warning(f"Language detection error (attempt {attempt+1}/{self.retry_attempts}): {e}")
-                time.sleep(1)  # Wait before retry
+                if attempt + 1 < self.retry_attempts:
+                    time.sleep(1)  # Wait before retry
                 
         logger.error("Language detection failed after multiple attempts")
         return 'en'  # Default to English
@@ -200,21 +415,18 @@ class TranslationHandler:
             
         if source_language == 'en':
             return text
-            
-        for attempt in range(self.retry_attempts):
-            try:
-                if source_language:
-                    translation = self.translator.translate(text, src=source_language, dest='en')
-                else:
-                    translation = self.translator.translate(text, dest='en')
-                logger.info(f"Translated to English: {translation.text[:50]}...")
-                return translation.text
-            except Exception as e:
-                logger.warning(f"Translation to English error (attempt {attempt+1}/{self.retry_attempts}): {e}")
-                time.sleep(1)  # Wait before retry
-                
-        logger.error("Translation to English failed after multiple attempts")
-        return text  # Return original as fallback
+        
+        # Without a known source language, skip the round trip when the text is clearly English already
+        if not source_language and self._identify_locally(text) == 'en':
+            self._count_detection("english_skips")
+            return text
+        
+        translated = self._translate(text, source_language, 'en')
+        if translated is None:
+            logger.error("Translation to English failed after multiple attempts")
+            return text  # Return original as fallback
+        logger.info(f"Translated to English: {translated[:50]}...")
+        return translated
     
     def translate_from_english(self, text: str, target_language: str) -> str:
         """Translate text from English to target language"""
@@ -223,86 +435,477 @@ class TranslationHandler:
             
         if target_language == 'en':
             return text
+        
+        translated = self._translate(text, 'en', target_language)
+        if translated is None:
+            logger.error(f"Translation to {target_language} failed after multiple attempts")
+            return text  # Return original as fallback
+        logger.info(f"Translated from English to {target_language}: {translated[:50]}...")
+        return translated
+    
+    def translate_batch(self, texts: List[str], target_language: str, source_language: Optional[str] = 'en') -> List[str]:
+        """
+        Translate several segments with one upstream call.
+        
+        Cached segments are served from the cache; the rest are joined with
+        newlines and translated together. If the result does not split back
+        into the same number of lines, each segment is translated on its own.
+        
+        Args:
+            texts: Segments to translate, e.g. the sentences of a reply
+            target_language: Language to translate into
+            source_language: Language of the segments, or None to auto-detect
             
-        for attempt in range(self.retry_attempts):
-            try:
-                translation = self.translator.translate(text, src='en', dest=target_language)
-                logger.info(f"Translated from English to {target_language}: {translation.text[:50]}...")
-                return translation.text
-            except Exception as e:
-                logger.warning(f"Translation from English error (attempt {attempt+1}/{self.retry_attempts}): {e}")
-                time.sleep(1)  # Wait before retry
-                
-        logger.error(f"Translation to {target_language} failed after multiple attempts")
-        return text  # Return original as fallback
+        Returns:
+            List[str]: Translations in input order (originals where translation failed)
+        """
+        results = list(texts)
+        if target_language == source_language:
+            return results
+        
+        missing: Dict[str, List[int]] = {}
+        for index, text in enumerate(texts):
+            if not text or text.isspace():
+                continue
+            cached = self.cache.get(self._cache_key(text, source_language, target_language))
+            if cached is not None:
+                results[index] = cached
+            else:
+                missing.setdefault(text, []).append(index)
+        if not missing:
+            return results
+        
+        segments = list(missing)
+        translated = None
+        if len(segments) > 1:
+            joined = "\n".join(" ".join(segment.split()) for segment in segments)
+            # The joined text is cached per segment below, not as a whole
+            batch = self._translate(joined, source_language, target_language, use_cache=False)
+            lines = batch.split("\n") if batch is not None else []
+            if len(lines) == len(segments):
+                translated = [line.strip() for line in lines]
+                for segment, line in zip(segments, translated):
+                    self.cache.set(self._cache_key(segment, source_language, target_language), line)
+            else:
+                logger.warning("Batch translation did not preserve segment boundaries; translating segments one by one")
+        if translated is None:
+            translated = [self._translate(segment, source_language, target_language) or segment for segment in segments]
+        
+        for segment, translation in zip(segments, translated):
+            for index in missing[segment]:
+                results[index] = translation
+        return results
+
+class ChatSessionCache:
+    """
+    Live Gemini chat objects keyed by conversation, with TTL eviction.
+    
+    Entries are kept in last-use order, so expired ones are always at the
+    front and can be dropped without scanning the whole cache.
+    """
+    
+    def __init__(self, ttl: int = 1800, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._evict_expired(time.time())
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["last_used"] = time.time()
+                self._entries.move_to_end(key)
+            return entry
+    
+    def put(self, key: str, chat: Any, synced_messages: int, last_reply: str, head: Tuple[str, ...] = (),
+            model: Optional[str] = None) -> None:
+        with self._lock:
+            self._entries[key] = {
+                "chat": chat,
+                "model": model,  # model the chat object was started with
+                "synced_messages": synced_messages,  # conversation length the chat history corresponds to
+                "head": head,  # leading messages; they change when history is trimmed or summarized
+                "last_reply": " ".join(last_reply.split()),  # whitespace-normalized
+                "last_used": time.time()
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def take(self, key: str) -> Optional[Dict[str, Any]]:
+        """Remove and return the entry, so concurrent turns never share a chat object"""
+        with self._lock:
+            self._evict_expired(time.time())
+            return self._entries.pop(key, None)
+    
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def cleanup_expired(self) -> int:
+        with self._lock:
+            return self._evict_expired(time.time())
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _evict_expired(self, now: float) -> int:
+        # Caller holds self._lock
+        removed = 0
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if now - entry["last_used"] <= self.ttl:
+                break
+            del self._entries[key]
+            removed += 1
+        return removed
 
 class ModelHandler:
-    def __init__(self, api_key: str, model: str = "gemini-1.5-pro", max_tokens: int = 150):
+    def __init__(self, api_key: str, model: str = "gemini-1.5-pro", max_tokens: int = 150,
+                 profiles: Iterable[str] = (CHARACTER_PROFILE,), max_concurrency: int = GEMINI_MAX_CONCURRENCY,
+                 model_factory: Optional[Callable[..., Any]] = None, router: Optional[ModelRouter] = None):
         if not api_key:
             raise ValueError("Google API key is required")
         genai.configure(api_key=api_key)
         self.model = model
         self.max_tokens = max_tokens
-        self.generation_config = {
+        # Read-only defaults; each call builds its own config (see _generation_config)
+        self.generation_config = MappingProxyType({
             "max_output_tokens": max_tokens,
             "temperature": 0.7,
             "top_p": 0.95,
             "top_k": 40
+        })
+        # Builds model objects; replaceable with a fake for benchmarks
+        self.model_factory = model_factory or genai.GenerativeModel
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        # Picks the fast or the large model per turn; without it every turn uses self.model
+        if router is None and MODEL_ROUTING_ENABLED:
+            router = ModelRouter(fast_model=FAST_MODEL, large_model=model)
+        self.router = router
+        # Models are compiled once per (model name, system instruction) and reused for every turn
+        self._models: Dict[Tuple[str, Optional[str]], Dict[str, Any]] = {}
+        self._models_lock = threading.Lock()
+        self.chat_cache = ChatSessionCache()
+        # Replies to stateless first-turn queries, reused for exact and near-duplicate questions
+        self.response_cache = SemanticResponseCache() if RESPONSE_CACHE_ENABLED else None
+        
+        # Request payload and latency counters, exposed through stats()
+        self.latency = LatencyStats()
+        self.first_chunk_latency = LatencyStats()
+        self._counters = {
+            "requests": 0,
+            "system_instruction_bytes": 0,  # profile bytes sent inline with requests
+            "context_cached_requests": 0,  # requests that referenced a cached profile instead
+            "dialogue_bytes": 0,  # history and prompt bytes
+            "in_flight": 0
         }
+        self._counters_lock = threading.Lock()
+        
+        # Compile the character profiles up front so no request pays for it
+        model_names = (self.router.fast_model, self.router.large_model) if self.router else (self.model,)
+        for profile in profiles:
+            for model_name in model_names:
+                self._get_model(model_name, profile)
+    
+    def _generation_config(self, temperature: float) -> Dict[str, Any]:
+        """Per-call generation config; the shared defaults are never modified"""
+        return {**self.generation_config, "temperature": temperature}
+    
+    @contextmanager
+    def _gemini_slot(self):
+        """Hold one of the max_concurrency in-flight request slots"""
+        with self._slots:
+            with self._counters_lock:
+                self._counters["in_flight"] += 1
+            try:
+                yield
+            finally:
+                with self._counters_lock:
+                    self._counters["in_flight"] -= 1
+    
+    def _get_model(self, model_name: str, system_instruction: Optional[str] = None):
+        return self._get_compiled(model_name, system_instruction)["model"]
+    
+    def _get_compiled(self, model_name: str, system_instruction: Optional[str] = None) -> Dict[str, Any]:
+        key = (model_name, system_instruction)
+        with self._models_lock:
+            compiled = self._models.get(key)
+            if compiled is None or (compiled["expires_at"] is not None and compiled["expires_at"] <= time.time()):
+                compiled = self._compile_model(model_name, system_instruction)
+                self._models[key] = compiled
+            return compiled
     
-    def generate_response(self, messages: List[Dict[str, str]], temperature: float = 0.7) -> str:
+    def _compile_model(self, model_name: str, system_instruction: Optional[str]) -> Dict[str, Any]:
+        """
+        Build a model that carries the profile as its native system instruction.
+        
+        Profiles above the provider's minimum cache size are uploaded once as
+        cached content and referenced by handle; smaller ones are sent as
+        system_instruction, since the API does not cache prefixes that short.
+        """
+        if system_instruction and estimate_tokens(system_instruction) >= CONTEXT_CACHE_MIN_TOKENS:
+            try:
+                cached = caching.CachedContent.create(
+                    model=model_name,
+                    system_instruction=system_instruction,
+                    ttl=datetime.timedelta(seconds=CONTEXT_CACHE_TTL)
+                )
+                logger.info(f"Cached system instruction for {model_name} as {cached.name}")
+                return {
+                    "model": genai.GenerativeModel.from_cached_content(
+                        cached, generation_config=dict(self.generation_config)
+                    ),
+                    "context_cached": True,
+                    # Recompile shortly before the provider drops the cache
+                    "expires_at": time.time() + CONTEXT_CACHE_TTL - 60
+                }
+            except Exception as e:
+                logger.warning(f"Context caching unavailable for {model_name}, sending profile inline: {e}")
+        
+        return {
+            "model": self.model_factory(model_name, generation_config=dict(self.generation_config),
+                                        system_instruction=system_instruction),
+            "context_cached": False,
+            "expires_at": None
+        }
+    
+    @staticmethod
+    def _split_messages(messages: List[Dict[str, str]]) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Split conversation messages into the system instruction and Gemini chat turns.
+        
+        The first system message (the character profile) becomes the system
+        instruction; later ones, such as the history summary, are dynamic and
+        are prepended to the first user turn instead.
+        """
+        profile = None
+        context_parts = []
+        formatted_messages = []
+        for msg in messages:
+            if msg["role"] == "system":
+                if profile is None:
+                    profile = msg["content"]
+                else:
+                    context_parts.append(msg["content"])
+                continue
+            role = "user" if msg["role"] == "user" else "model"
+            formatted_messages.append({"role": role, "parts": [msg["content"]]})
+        
+        if context_parts and formatted_messages and formatted_messages[0]["role"] == "user":
+            context = "\n\n".join(context_parts)
+            formatted_messages[0]["parts"][0] = f"{context}\n\nUser: {formatted_messages[0]['parts'][0]}"
+        return profile or CHARACTER_PROFILE, formatted_messages
+    
+    def _record_request(self, messages: List[Dict[str, str]], model_name: str, seconds: float, success: bool) -> None:
+        profile = None
+        dialogue_bytes = 0
+        for msg in messages:
+            if profile is None and msg["role"] == "system":
+                profile = msg["content"]
+            else:
+                # The chat API sends the whole history with every request
+                dialogue_bytes += len(msg["content"].encode("utf-8"))
+        profile = profile or CHARACTER_PROFILE
+        compiled = self._models.get((model_name, profile))
+        context_cached = bool(compiled and compiled["context_cached"])
+        with self._counters_lock:
+            self._counters["requests"] += 1
+            self._counters["dialogue_bytes"] += dialogue_bytes
+            if context_cached:
+                self._counters["context_cached_requests"] += 1
+            else:
+                self._counters["system_instruction_bytes"] += len(profile.encode("utf-8"))
+        self.latency.record(seconds, success)
+        if self.router is not None:
+            self.router.record(model_name, seconds, success)
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._counters_lock:
+            stats: Dict[str, Any] = dict(self._counters)
+        stats["latency"] = self.latency.snapshot()
+        stats["max_concurrency"] = self.max_concurrency
+        stats["first_chunk_latency"] = self.first_chunk_latency.snapshot()
+        if self.response_cache is not None:
+            stats["response_cache"] = self.response_cache.stats()
+        if self.router is not None:
+            stats["routing"] = self.router.stats()
+        return stats
+    
+    def _response_scope(self, messages: List[Dict[str, str]], temperature: float) -> Optional[str]:
+        """
+        Response cache scope for a first-turn query (routed model + temperature + profile),
+        or None if the reply depends on history
+        """
+        if (self.response_cache is None or len(messages) != 2
+                or messages[0]["role"] != "system" or messages[1]["role"] != "user"):
+            return None
+        # classify() rather than choose(): same model the turn will be routed to, without counting a route
+        model_name = self.router.classify(messages)[0] if self.router else self.model
+        profile_digest = hashlib.sha256(messages[0]["content"].encode("utf-8")).hexdigest()[:16]
+        return f"{model_name}:{temperature}:{profile_digest}"
+    
+    @staticmethod
+    def _history_head(messages: List[Dict[str, str]]) -> Tuple[str, ...]:
+        return tuple(msg["content"] for msg in messages[:2])
+    
+    def summarize(self, messages: List[Dict[str, str]], previous_summary: Optional[str] = None) -> str:
+        """
+        Fold messages trimmed from a conversation into its rolling summary.
+        
+        Args:
+            messages: Trimmed user/assistant messages, oldest first
+            previous_summary: Summary produced for earlier trims, if any
+            
+        Returns:
+            str: The updated summary
+        """
+        transcript = "\n".join(f"{msg['role']}: {msg['content']}" for msg in messages)
+        prompt = SUMMARY_PROMPT.format(previous=previous_summary or "(none)", transcript=transcript)
+        with self._gemini_slot():
+            response = self._get_model(SUMMARY_MODEL).generate_content(
+                prompt, generation_config={"max_output_tokens": SUMMARY_MAX_TOKENS, "temperature": 0.2}
+            )
+        return response.text.strip()
+    
+    def _prepare_chat(self, messages: List[Dict[str, str]], session_id: Optional[str]) -> Tuple[Any, str, str]:
+        """
+        Return (chat, prompt, model name) for the newest user turn.
+        
+        The model is chosen by the router when one is configured.
+        When session_id is given, the live chat object from the previous turn is
+        reused and only the new user turn is sent; the full history is rebuilt
+        only if the conversation no longer matches the cached chat (new session,
+        trimmed or summarized history, expired entry, different model).
+        """
+        model_name = self.router.choose(messages) if self.router else self.model
+        # Checked out of the cache: a concurrent turn of the same session builds its own chat
+        entry = self.chat_cache.take(session_id) if session_id else None
+        if (entry is not None and entry["synced_messages"] == len(messages) - 1
+                and len(messages) >= 2 and entry["head"] == self._history_head(messages)
+                and entry["model"] == model_name
+                and " ".join(messages[-2]["content"].split()) == entry["last_reply"]):
+            return entry["chat"], messages[-1]["content"], model_name
+        
+        profile, formatted_messages = self._split_messages(messages)
+        chat = self._get_model(model_name, profile).start_chat(
+            history=formatted_messages[:-1] if len(formatted_messages) > 1 else []
+        )
+        prompt = formatted_messages[-1]["parts"][0] if formatted_messages else "Hello"
+        return chat, prompt, model_name
+    
+    def generate_response(self, messages: List[Dict[str, str]], temperature: float = 0.7,
+                          session_id: Optional[str] = None) -> str:
         """Generate response from Google Gemini model"""
         if not messages:
             logger.error("No messages provided for response generation")
             return "I don't have any context to respond to."
+        
+        cache_scope = self._response_scope(messages, temperature)
+        if cache_scope:
+            cached = self.response_cache.get(cache_scope, messages[-1]["content"])
+            if cached is not None:
+                return cached
             
+        start = time.perf_counter()
+        success = False
+        model_name = self.model
         try:
-            # Update temperature in generation config
-            self.generation_config["temperature"] = temperature
-            
-            # Format messages for Gemini API
-            formatted_messages = []
-            for msg in messages:
-                role = "user" if msg["role"] == "user" else "model"
-                if msg["role"] == "system":
-                    # Prepend system message to the first user message
-                    continue
-                formatted_messages.append({"role": role, "parts": [msg["content"]]})
-            
-            # Ensure there's a system message by adding it to the beginning
-            system_content = next((msg["content"] for msg in messages if msg["role"] == "system"), CHARACTER_PROFILE)
-            if formatted_messages and formatted_messages[0]["role"] == "user":
-                # Add system message as a prefix to the first user message
-                formatted_messages[0]["parts"][0] = f"{system_content}\n\nUser: {formatted_messages[0]['parts'][0]}"
-            
-            logger.info(f"Generating response using {self.model} (temp: {temperature})")
-            
-            # Get the model
-            model = genai.GenerativeModel(self.model, generation_config=self.generation_config)
-            
-            # Create or continue a chat session
-            chat = model.start_chat(history=formatted_messages[:-1] if len(formatted_messages) > 1 else [])
+            chat, prompt, model_name = self._prepare_chat(messages, session_id)
+            logger.info(f"Generating response using {model_name} (temp: {temperature})")
             
             # Generate response
-            response = chat.send_message(formatted_messages[-1]["parts"][0] if formatted_messages else "Hello")
+            with self._gemini_slot():
+                response = chat.send_message(prompt, generation_config=self._generation_config(temperature))
             content = response.text.strip()
             
+            if session_id:
+                # The caller appends this reply, so the chat will match len(messages) + 1 messages
+                self.chat_cache.put(session_id, chat, len(messages) + 1, content,
+                                    self._history_head(messages), model_name)
+            
+            if cache_scope:
+                self.response_cache.set(cache_scope, messages[-1]["content"], content)
+            
             logger.info(f"Response generated: {content[:50]}...")
+            success = True
             return content
         except Exception as e:
             logger.error(f"Gemini API error: {e}")
             return "I'm having trouble processing your request right now."
+        finally:
+            self._record_request(messages, model_name, time.perf_counter() - start, success)
+    
+    def generate_response_stream(self, messages: List[Dict[str, str]], temperature: float = 0.7,
+                                 session_id: Optional[str] = None) -> Iterator[str]:
+        """Stream the Gemini response as text chunks while it is being generated"""
+        if not messages:
+            logger.error("No messages provided for response generation")
+            yield "I don't have any context to respond to."
+            return
+        
+        cache_scope = self._response_scope(messages, temperature)
+        if cache_scope:
+            cached = self.response_cache.get(cache_scope, messages[-1]["content"])
+            if cached is not None:
+                yield cached
+                return
+        
+        parts: List[str] = []
+        start = time.perf_counter()
+        success = False
+        model_name = self.model
+        try:
+            chat, prompt, model_name = self._prepare_chat(messages, session_id)
+            logger.info(f"Streaming response using {model_name} (temp: {temperature})")
+            # The slot is held until the stream is fully read
+            with self._gemini_slot():
+                response = chat.send_message(prompt, generation_config=self._generation_config(temperature),
+                                             stream=True)
+                for chunk in response:
+                    text = chunk.text
+                    if text:
+                        if not parts:
+                            self.first_chunk_latency.record(time.perf_counter() - start)
+                        parts.append(text)
+                        yield text
+            
+            content = "".join(parts).strip()
+            if session_id:
+                self.chat_cache.put(session_id, chat, len(messages) + 1, content,
+                                    self._history_head(messages), model_name)
+            if cache_scope:
+                self.response_cache.set(cache_scope, messages[-1]["content"], content)
+            logger.info(f"Response streamed: {content[:50]}...")
+            success = True
+        except Exception as e:
+            logger.error(f"Gemini API error: {e}")
+            if not parts:
+                yield "I'm having trouble processing your request right now."
+        finally:
+            self._record_request(messages, model_name, time.perf_counter() - start, success)
 
 class VoiceAssistant:
     def __init__(self, gemini_api_key: str, character_profile: str = CHARACTER_PROFILE):
         """Initialize the voice assistant with all necessary components"""
         self.character_profile = character_profile
-        self.conversation_manager = ConversationManager()
+        self.conversation_manager = ConversationManager(profile=character_profile)
         self.speech_handler = GladiaSpeechHandler()  # Using the new Gladia speech handler
+        self.audio_preprocessor = AudioPreprocessor()
         self.translation_handler = TranslationHandler()
+        # Turn latency per pipeline mode, to compare the translate and direct paths
+        self.pipeline_latency: Dict[str, LatencyStats] = {}
+        for mode in PIPELINE_MODES:
+            self.pipeline_latency[mode] = LatencyStats()
+            self.pipeline_latency[f"{mode}_stream_first_segment"] = LatencyStats()
         
         try:
-            self.model_handler = ModelHandler(gemini_api_key)
+            self.model_handler = ModelHandler(gemini_api_key, profiles=(character_profile,))
+            # Turns trimmed from long conversations are summarized in the background
+            self.conversation_manager.summarizer = self.model_handler.summarize
             logger.info("Voice assistant initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize voice assistant: {e}")
@@ -317,26 +920,106 @@ class VoiceAssistant:
         
         def cleanup_job():
             while True:
-                time.sleep(3600)  # Run once per hour
+                # Small, frequent slices instead of an occasional sweep of every expired session
+                time.sleep(SESSION_EXPIRY_INTERVAL)
                 try:
-                    self.conversation_manager.cleanup_expired_sessions()
+                    self.conversation_manager.cleanup_expired_sessions(limit=EXPIRY_SLICE)
+                    self.model_handler.chat_cache.cleanup_expired()
                 except Exception as e:
                     logger.error(f"Error in session cleanup: {e}")
         
         cleanup_thread = threading.Thread(target=cleanup_job, daemon=True)
         cleanup_thread.start()
     
-    def run_session(self, audio_path: str, target_language: str) -> str:
-        """Run a complete conversation session"""
+    def _session_for(self, session_key: Optional[str], pipeline: str = PIPELINE_TRANSLATE) -> str:
+        """Resume the conversation bound to session_key, or start an anonymous one-off session"""
+        if session_key:
+            # Translate mode keeps English history, direct mode the user's own language; never mix them
+            if pipeline == PIPELINE_DIRECT:
+                session_key = f"{session_key}:{PIPELINE_DIRECT}"
+            return self.conversation_manager.get_or_create_session(session_key)
+        session_id = self.conversation_manager.create_session()
+        logger.info(f"Session created: {session_id}")
+        return session_id
+    
+    def recognize(self, audio_path: str) -> Tuple[str, Optional[str]]:
+        """Preprocess and transcribe a recording. Returns (transcript, detected_language)"""
+        # Downmix, resample and trim silence before uploading
+        processed_path = self.audio_preprocessor.preprocess(audio_path)
         try:
-            session_id = self.conversation_manager.create_session()
-            logger.info(f"Session created: {session_id}")
-
             # Convert audio to text using Gladia API
-            user_input, detected_language = self.speech_handler.recognize_audio(audio_path)
+            return self.speech_handler.recognize_audio(processed_path)
+        finally:
+            if processed_path != audio_path and os.path.exists(processed_path):
+                os.remove(processed_path)
+    
+    def run_session(self, audio_path: str, target_language: str, session_key: Optional[str] = None,
+                    pipeline: Optional[str] = None) -> str:
+        """
+        Run one conversation turn from recorded audio.
+        
+        Args:
+            audio_path: Path to the recording
+            target_language: Language code for the reply
+            session_key: Stable per-user key (e.g. the Flask session ID); turns
+                with the same key share conversation history
+            pipeline: "translate" or "direct" (see PIPELINE_MODES); defaults to DEFAULT_PIPELINE
+        """
+        try:
+            user_input, detected_language = self.recognize(audio_path)
             if not user_input or user_input == "Could not understand audio":
                 return "Sorry, I couldn't understand the audio. Please try again."
 
+            return self.respond_to_transcript(user_input, detected_language, target_language, session_key, pipeline)
+            
+        except Exception as e:
+            logger.error(f"Error in run_session: {e}", exc_info=True)
+            return "I'm sorry, but I encountered an error processing your request."
+    
+    def resolve_pipeline(self, pipeline: Optional[str]) -> str:
+        """Return a valid pipeline mode for a per-request choice, falling back to the default"""
+        if pipeline in PIPELINE_MODES:
+            return pipeline
+        if pipeline:
+            logger.warning(f"Unknown pipeline mode '{pipeline}', using '{DEFAULT_PIPELINE}'")
+        return DEFAULT_PIPELINE
+    
+    def _direct_conversation(self, session_id: str, target_language: str) -> List[Dict[str, str]]:
+        """Conversation for the direct pipeline, with the reply-language instruction added to the profile"""
+        conversation = self.conversation_manager.get_conversation(session_id)
+        # Part of the system instruction, not a dynamic message merged into the first user turn
+        instruction = DIRECT_REPLY_INSTRUCTION.format(language=target_language)
+        conversation[0] = {"role": "system", "content": f"{conversation[0]['content']}\n\n{instruction}"}
+        return conversation
+    
+    def _respond_direct(self, session_id: str, user_input: str, detected_language: Optional[str],
+                        target_language: str) -> str:
+        """One model call: original-language input in, target-language reply out; history stays untranslated"""
+        if detected_language:
+            self.conversation_manager.set_language(session_id, detected_language)
+        self.conversation_manager.add_message(session_id, "user", user_input)
+        
+        conversation = self._direct_conversation(session_id, target_language)
+        response = self.model_handler.generate_response(conversation, session_id=session_id)
+        
+        self.conversation_manager.add_message(session_id, "assistant", response)
+        self.conversation_manager.trim_conversation(session_id)
+        return response
+    
+    def respond_to_transcript(self, user_input: str, detected_language: Optional[str], target_language: str,
+                              session_key: Optional[str] = None, pipeline: Optional[str] = None) -> str:
+        """Generate a reply to already-transcribed speech (recorded clip or live stream)"""
+        pipeline = self.resolve_pipeline(pipeline)
+        start = time.perf_counter()
+        success = False
+        try:
+            session_id = self._session_for(session_key, pipeline)
+            
+            if pipeline == PIPELINE_DIRECT:
+                response = self._respond_direct(session_id, user_input, detected_language, target_language)
+                success = True
+                return response
+
             # Use detected language from Gladia if available, otherwise fall back to our detector
             source_language = detected_language
             if not source_language:
@@ -353,7 +1036,7 @@ class VoiceAssistant:
 
             # Generate response
             conversation = self.conversation_manager.get_conversation(session_id)
-            english_response = self.model_handler.generate_response(conversation)
+            english_response = self.model_handler.generate_response(conversation, session_id=session_id)
 
             # Translate response back to user's language
             translated_response = self.translation_handler.translate_from_english(english_response, target_language)
@@ -364,16 +1047,68 @@ class VoiceAssistant:
             # Trim conversation if needed
             self.conversation_manager.trim_conversation(session_id)
             
+            success = True
             return translated_response
             
         except Exception as e:
-            logger.error(f"Error in run_session: {e}", exc_info=True)
+            logger.error(f"Error in respond_to_transcript: {e}", exc_info=True)
             return "I'm sorry, but I encountered an error processing your request."
+        finally:
+            self.pipeline_latency[pipeline].record(time.perf_counter() - start, success)
     
-    def process_text_input(self, text_input: str, source_language: str, target_language: str) -> str:
+    def respond_stream(self, user_input: str, detected_language: Optional[str],
+                       session_key: Optional[str] = None, target_language: Optional[str] = None,
+                       pipeline: Optional[str] = None) -> Iterator[str]:
+        """
+        Stream the reply to a transcript sentence by sentence.
+        
+        Sentences are yielded as soon as the model has finished them; the full
+        reply is added to the conversation once the stream completes.
+        In the translate pipeline the sentences are English and translation to
+        the target language is left to the caller so it can run in parallel
+        with generation. In the direct pipeline they are already in
+        target_language.
+        """
+        direct = self.resolve_pipeline(pipeline) == PIPELINE_DIRECT and bool(target_language)
+        session_id = self._session_for(session_key, PIPELINE_DIRECT if direct else PIPELINE_TRANSLATE)
+        
+        if direct:
+            if detected_language:
+                self.conversation_manager.set_language(session_id, detected_language)
+            self.conversation_manager.add_message(session_id, "user", user_input)
+            conversation = self._direct_conversation(session_id, target_language)
+        else:
+            source_language = detected_language
+            if not source_language:
+                source_language = self.translation_handler.detect_language(user_input)
+            self.conversation_manager.set_language(session_id, source_language)
+            
+            english_input = self.translation_handler.translate_to_english(user_input, source_language)
+            self.conversation_manager.add_message(session_id, "user", english_input)
+            
+            conversation = self.conversation_manager.get_conversation(session_id)
+        
+        sentences = []
+        for sentence in iter_sentences(self.model_handler.generate_response_stream(conversation, session_id=session_id)):
+            sentences.append(sentence)
+            yield sentence
+        
+        self.conversation_manager.add_message(session_id, "assistant", " ".join(sentences))
+        self.conversation_manager.trim_conversation(session_id)
+    
+    def process_text_input(self, text_input: str, source_language: str, target_language: str,
+                           session_key: Optional[str] = None, pipeline: Optional[str] = None) -> str:
         """Process text input directly without speech recognition"""
+        pipeline = self.resolve_pipeline(pipeline)
+        start = time.perf_counter()
+        success = False
         try:
-            session_id = self.conversation_manager.create_session()
+            session_id = self._session_for(session_key, pipeline)
+            
+            if pipeline == PIPELINE_DIRECT:
+                response = self._respond_direct(session_id, text_input, source_language, target_language)
+                success = True
+                return response
             
             # Translate to English if needed
             english_input = text_input
@@ -385,7 +1120,7 @@ class VoiceAssistant:
             
             # Generate response
             conversation = self.conversation_manager.get_conversation(session_id)
-            english_response = self.model_handler.generate_response(conversation)
+            english_response = self.model_handler.generate_response(conversation, session_id=session_id)
             
             # Translate response if needed
             result = english_response
@@ -394,9 +1129,17 @@ class VoiceAssistant:
                 
             # Add assistant response to conversation history
             self.conversation_manager.add_message(session_id, "assistant", english_response)
+            self.conversation_manager.trim_conversation(session_id)
             
+            success = True
             return result
             
         except Exception as e:
             logger.error(f"Error in process_text_input: {e}")
-            return "I'm sorry, but I encountered an error processing your request."
\ No newline at end of file
+            return "I'm sorry, but I encountered an error processing your request."
+        finally:
+            self.pipeline_latency[pipeline].record(time.perf_counter() - start, success)
+    
+    def pipeline_stats(self) -> Dict[str, Any]:
+        """Latency per pipeline mode"""
+        return {name: stats.snapshot() for name, stats in self.pipeline_latency.items()}
\ No newline at end of file
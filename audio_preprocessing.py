@@ -0,0 +1,124 @@
+import os
+import logging
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+TARGET_SAMPLE_RATE = 16000  # Hz, what the speech models work at internally
+SILENCE_THRESHOLD_DBFS = -40.0  # frames quieter than this count as silence
+SILENCE_CHUNK_MS = 10  # energy window used by the silence detector
+SILENCE_PADDING_MS = 150  # audio kept around detected speech
+MIN_SPEECH_MS = 300  # below this the trim is discarded and the whole clip kept
+
+# "flac" (lossless) or "opus" (Ogg/Opus, smallest)
+OUTPUT_FORMAT = os.getenv("AUDIO_PREPROCESS_FORMAT", "flac").lower()
+PREPROCESS_WORKERS = int(os.getenv("AUDIO_PREPROCESS_WORKERS", 2))
+PREPROCESS_TIMEOUT = 30  # seconds before falling back to the raw recording
+PREPROCESS_DIR = os.getenv("AUDIO_PREPROCESS_DIR")  # where encoded files are written; None = system temp dir
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _trim_silence(audio, threshold_dbfs: float, chunk_ms: int, padding_ms: int):
+    """Energy-based VAD: cut leading and trailing runs of low-energy frames"""
+    from pydub.silence import detect_leading_silence
+
+    start = detect_leading_silence(audio, silence_threshold=threshold_dbfs, chunk_size=chunk_ms)
+    end = len(audio) - detect_leading_silence(audio.reverse(), silence_threshold=threshold_dbfs,
+                                              chunk_size=chunk_ms)
+    if end - start < MIN_SPEECH_MS:
+        return audio
+    return audio[max(start - padding_ms, 0):min(end + padding_ms, len(audio))]
+
+
+def preprocess_file(src_path: str, dst_path: str, output_format: str = OUTPUT_FORMAT,
+                    threshold_dbfs: float = SILENCE_THRESHOLD_DBFS) -> str:
+    """
+    Downmix to mono, resample to 16 kHz, trim silence and re-encode.
+
+    Runs on a preprocessing worker thread.
+
+    Returns:
+        str: Path of the encoded output file
+    """
+    from pydub import AudioSegment
+
+    audio = AudioSegment.from_file(src_path)
+    audio = audio.set_channels(1).set_frame_rate(TARGET_SAMPLE_RATE).set_sample_width(2)
+    audio = _trim_silence(audio, threshold_dbfs, SILENCE_CHUNK_MS, SILENCE_PADDING_MS)
+
+    if output_format == "opus":
+        audio.export(dst_path, format="ogg", codec="libopus", bitrate="24k")
+    else:
+        audio.export(dst_path, format="flac")
+    return dst_path
+
+
+class AudioPreprocessor:
+    """
+    Normalizes recordings before they are uploaded for transcription.
+
+    The work runs on a small thread pool. pydub hands decoding and encoding
+    to ffmpeg subprocesses, so the threads mostly wait; a process pool would
+    have to fork a server full of threads (deadlock-prone) or spawn workers
+    that re-import the whole app as __mp_main__. Any failure falls back to
+    the original file, so preprocessing can only make uploads smaller,
+    never break them.
+    """
+
+    def __init__(self, workers: int = PREPROCESS_WORKERS, output_format: str = OUTPUT_FORMAT,
+                 timeout: float = PREPROCESS_TIMEOUT, output_dir: Optional[str] = PREPROCESS_DIR):
+        self.workers = workers
+        self.output_format = output_format
+        self.timeout = timeout
+        self.output_dir = output_dir
+        self._executor: Optional[ThreadPoolExecutor] = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="audio-preprocess"
+        )
+
+    def output_path_for(self, audio_path: str) -> str:
+        """A new, unique file for one preprocessing run (concurrent runs of one recording never collide)"""
+        extension = ".ogg" if self.output_format == "opus" else ".flac"
+        stem = os.path.splitext(os.path.basename(audio_path))[0]
+        fd, path = tempfile.mkstemp(prefix=f"{stem}_preprocessed_", suffix=extension, dir=self.output_dir)
+        os.close(fd)
+        return path
+
+    def preprocess(self, audio_path: str) -> str:
+        """
+        Preprocess an audio file.
+
+        Returns:
+            str: Path of the preprocessed file, or audio_path itself if preprocessing failed
+        """
+        if self._executor is None:
+            return audio_path
+        dst_path = self.output_path_for(audio_path)
+        future: Optional[Future] = None
+        try:
+            future = self._executor.submit(preprocess_file, audio_path, dst_path, self.output_format)
+            result_path = future.result(timeout=self.timeout)
+            original_size = os.path.getsize(audio_path)
+            processed_size = os.path.getsize(result_path)
+            logger.info(f"Preprocessed audio {audio_path}: {original_size} -> {processed_size} bytes")
+            return result_path
+        except Exception as e:
+            logger.warning(f"Audio preprocessing failed, uploading original file: {e!r}")
+            _remove_quietly(dst_path)
+            if future is not None and not future.cancel():
+                # Timed out while running: the worker may still write dst_path, so delete it once it finishes
+                future.add_done_callback(lambda _: _remove_quietly(dst_path))
+            return audio_path
+
+    def shutdown(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,91 @@
+"""
+Throughput benchmark: concurrent ModelHandler.generate_response calls.
+
+Runs against a local fake model (no network, no API key) whose replies take
+a fixed time, like a remote endpoint, and reports requests per second as the
+number of worker threads grows. Throughput should scale with the worker
+count up to the handler's in-flight limit and then flatten.
+
+    python benchmarks/bench_model_concurrency.py [requests] [latency_ms] [max_concurrency]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from assistant import ModelHandler, CHARACTER_PROFILE  # noqa: E402
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeChat:
+    def __init__(self, latency, history):
+        self.latency = latency
+        self.history = list(history)
+
+    def send_message(self, prompt, generation_config=None, stream=False):
+        time.sleep(self.latency)  # stands in for the network round trip
+        return FakeResponse(f"echo (t={generation_config['temperature']}): {prompt[-20:]}")
+
+
+class FakeModelFactory:
+    """Drop-in for genai.GenerativeModel that answers after a fixed delay"""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def __call__(self, model_name, generation_config=None, system_instruction=None):
+        factory = self
+
+        class FakeModel:
+            def start_chat(self, history=None):
+                return FakeChat(factory.latency, history or [])
+
+        return FakeModel()
+
+
+def run(handler, workers, requests):
+    temperatures = [0.2, 0.7, 1.0]
+    errors = []
+
+    def one(i):
+        temperature = temperatures[i % len(temperatures)]
+        messages = [
+            {"role": "system", "content": CHARACTER_PROFILE},
+            {"role": "user", "content": f"question number {i} for worker test"},
+        ]
+        reply = handler.generate_response(messages, temperature=temperature, session_id=f"bench-{i}")
+        # Each reply must carry its own request's temperature (no shared-config races)
+        if f"(t={temperature})" not in reply:
+            errors.append(reply)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(one, range(requests)))
+    return requests / (time.perf_counter() - start), errors
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+    max_concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+
+    handler = ModelHandler("fake-key", model_factory=FakeModelFactory(latency), max_concurrency=max_concurrency)
+    handler.response_cache = None  # every request should reach the model
+
+    print(f"{requests} requests, {latency * 1000:.0f} ms fake model latency, max_concurrency={max_concurrency}")
+    baseline = None
+    for workers in (1, 2, 4, 8, 16, 32):
+        throughput, errors = run(handler, workers, requests)
+        baseline = baseline or throughput
+        print(f"  {workers:>3} workers  {throughput:8.1f} req/s  ({throughput / baseline:5.1f}x)"
+              f"  config races: {len(errors)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Micro-benchmark: Gladia result extraction.
+
+Compares the previous approach (up to five recursive find_in_dict scans)
+against parse_transcription_result (one traversal, then cached paths) on
+synthetic responses shaped like Gladia v2 results with word-level arrays.
+
+    python benchmarks/bench_result_extraction.py [utterances] [repeats]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from gladia_api import find_in_dict, parse_transcription_result  # noqa: E402
+
+
+def make_payload(utterances, words_per_utterance=20):
+    """Build a response where the language is only present per utterance (the slow path)."""
+    items = []
+    for u in range(utterances):
+        words = [{"word": f"w{w}", "start": w * 0.3, "end": w * 0.3 + 0.25, "confidence": 0.9}
+                 for w in range(words_per_utterance)]
+        items.append({
+            "text": " ".join(word["word"] for word in words),
+            "start": u * 6.0,
+            "end": u * 6.0 + 5.5,
+            "confidence": 0.9,
+            "channel": 0,
+            "words": words,
+            "language": "en",
+        })
+    return {
+        "id": "bench",
+        "status": "done",
+        "result": {
+            "metadata": {"audio_duration": utterances * 6.0, "number_of_distinct_channels": 1},
+            "transcription": {
+                "languages": ["en"],
+                "utterances": items,
+                "full_transcript": " ".join(item["text"] for item in items),
+            },
+        },
+    }
+
+
+def legacy_extract(transcription_result):
+    """The extraction logic transcribe_audio used before the single-pass extractor."""
+    transcript = transcription_result.get('result', {}).get('transcription', {}).get('full_transcript')
+    if not transcript:
+        transcript, _ = find_in_dict(transcription_result, 'full_transcript')
+    language = transcription_result.get('result', {}).get('transcription', {}).get('language')
+    if not language:
+        language = transcription_result.get('result', {}).get('transcription', {}).get('detected_language')
+    if not language:
+        language = transcription_result.get('result', {}).get('metadata', {}).get('language')
+    if not language:
+        for field in ['language', 'detected_language', 'spoken_language']:
+            language_value, _ = find_in_dict(transcription_result, field)
+            if language_value:
+                language = language_value
+                break
+    if not language:
+        find_in_dict(transcription_result, 'locale')
+    return transcript, language
+
+
+def strip_languages(payload):
+    """Variant with no language anywhere: every fallback has to scan the whole tree."""
+    for item in payload["result"]["transcription"]["utterances"]:
+        item.pop("language", None)
+    return payload
+
+
+def timeit(fn, payload, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(payload)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    utterances = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    cases = [
+        ("language per utterance", make_payload(utterances)),
+        ("no language anywhere", strip_languages(make_payload(utterances))),
+    ]
+    print(f"{utterances} utterances x 20 words, {repeats} repeats (ms per response)")
+    for name, payload in cases:
+        assert parse_transcription_result(payload).transcript == legacy_extract(payload)[0]
+        legacy = timeit(legacy_extract, payload, repeats)
+        single = timeit(parse_transcription_result, payload, repeats)
+        print(f"  {name:<24} legacy {legacy:9.3f}   single-pass/cached {single:9.3f}   ({legacy / single:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
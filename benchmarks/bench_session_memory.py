@@ -0,0 +1,81 @@
+"""
+Memory benchmark: bytes per idle session in ConversationManager.
+
+Fills the in-memory conversation store with N sessions of a few short turns
+each and reports traced allocations per session (excluding the message
+text itself, which costs the same in any layout), next to the previous
+layout (one dict per message plus a per-session copy of the system message
+dict) built from the same strings.
+
+    python benchmarks/bench_session_memory.py [turns_per_session]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from conversation_store import InMemoryConversationStore  # noqa: E402
+from assistant import ConversationManager, CHARACTER_PROFILE  # noqa: E402
+
+
+def texts(i, turns):
+    """Unique user/assistant strings for session i, created outside the measurement"""
+    return [(f"question {i}-{t}: what's the weather like today?",
+             f"answer {i}-{t}: sunny with a light breeze, about 21 degrees.") for t in range(turns)]
+
+
+def measure_store(sessions, turns):
+    corpus = [texts(i, turns) for i in range(sessions)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    manager = ConversationManager(max_sessions=sessions, store=InMemoryConversationStore(max_sessions=sessions))
+    for i, pairs in enumerate(corpus):
+        session_id = manager.create_session(f"session-{i:06d}")
+        manager.set_language(session_id, "fr")
+        for question, answer in pairs:
+            manager.add_message(session_id, "user", question)
+            manager.add_message(session_id, "assistant", answer)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    manager._summary_executor.shutdown()
+    return used / sessions
+
+
+def measure_legacy(sessions, turns):
+    corpus = [texts(i, turns) for i in range(sessions)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = {}
+    for i, pairs in enumerate(corpus):
+        conversation = [{"role": "system", "content": CHARACTER_PROFILE}]
+        for question, answer in pairs:
+            conversation.append({"role": "user", "content": question})
+            conversation.append({"role": "assistant", "content": answer})
+        store[f"session-{i:06d}"] = {
+            "conversation": conversation,
+            "source_language": "fr",
+            "summary": None,
+            "unsummarized": [],
+            "summarizing": False,
+            "last_activity": time.time(),
+        }
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / sessions
+
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    # Message text is allocated before measuring, so only per-message and per-session overhead is counted
+    print(f"{turns} user/assistant turns per session (message text excluded)")
+    print(f"  {'sessions':>9}  {'store B/session':>15}  {'dict layout B/session':>21}  {'saved':>6}")
+    for sessions in (1_000, 10_000, 100_000):
+        compact = measure_store(sessions, turns)
+        legacy = measure_legacy(sessions, turns)
+        print(f"  {sessions:>9}  {compact:>15.0f}  {legacy:>21.0f}  {1 - compact / legacy:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Stress test: the in-memory conversation store under concurrent access.
+
+Worker threads create sessions, append turns, read them back and trim them
+while an expiry thread removes idle sessions in small slices, as the
+VoiceAssistant cleanup thread does. Checks that no operation raises, that
+every window read back is in append order for its session, and that expiry
+empties the store at the end. It reports throughput and the longest single
+expiry call for a single lock against the default striping.
+
+    python benchmarks/stress_session_store.py [threads] [seconds]
+"""
+import os
+import sys
+import time
+import random
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from conversation_store import InMemoryConversationStore, SESSION_SHARDS, EXPIRY_SLICE  # noqa: E402
+
+SESSION_TIMEOUT = 0.05  # seconds; short, so expiry races with live sessions all the time
+
+
+def worker(store, worker_id, deadline, counts, errors):
+    rng = random.Random(worker_id)
+    operations = 0
+    try:
+        while time.monotonic() < deadline:
+            session_id = f"w{worker_id}-s{rng.randrange(200)}"
+            store.create(session_id)
+            for turn in range(rng.randrange(1, 6)):
+                # False means expiry won the race for this session, which is allowed
+                store.append(session_id, "user", f"{session_id} {turn} question")
+                store.append(session_id, "assistant", f"{session_id} {turn} answer")
+                operations += 2
+            window = store.messages(session_id, limit=8)
+            if window is not None:
+                first_seq, messages = window
+                contents = [message["content"] for message in messages]
+                if any(not content.startswith(session_id + " ") for content in contents):
+                    errors.append(f"foreign message in {session_id}: {contents}")
+                # Turns within a session are appended in order: user then assistant, turn numbers rising
+                for older, newer in zip(messages, messages[1:]):
+                    if older["role"] == newer["role"]:
+                        errors.append(f"out-of-order roles in {session_id}: {contents}")
+                        break
+                if len(messages) > 4:
+                    store.trim_before(session_id, first_seq + 2)
+            store.set_meta(session_id, source_language=rng.choice(("fr", "es", "de")))
+            store.get_meta(session_id)
+            operations += 4
+    except Exception as e:  # any exception is a failure of the store
+        errors.append(f"worker {worker_id}: {e!r}")
+    counts[worker_id] = operations
+
+
+def expirer(store, stop, stats, errors):
+    try:
+        while not stop.is_set():
+            start = time.perf_counter()
+            stats["expired"] += store.expire(SESSION_TIMEOUT, limit=EXPIRY_SLICE)
+            stats["max_call"] = max(stats["max_call"], time.perf_counter() - start)
+            stats["calls"] += 1
+            time.sleep(0.001)
+    except Exception as e:
+        errors.append(f"expirer: {e!r}")
+
+
+def run(shards, threads, seconds):
+    store = InMemoryConversationStore(max_sessions=1_000_000, shards=shards)
+    counts = [0] * threads
+    errors = []
+    stats = {"expired": 0, "max_call": 0.0, "calls": 0}
+    stop = threading.Event()
+    deadline = time.monotonic() + seconds
+
+    expiry_thread = threading.Thread(target=expirer, args=(store, stop, stats, errors))
+    expiry_thread.start()
+    workers = [threading.Thread(target=worker, args=(store, i, deadline, counts, errors)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    expiry_thread.join()
+
+    time.sleep(SESSION_TIMEOUT * 2)
+    while store.expire(SESSION_TIMEOUT, limit=EXPIRY_SLICE):
+        pass
+    if len(store):
+        errors.append(f"{len(store)} sessions left after expiry")
+    return sum(counts) / elapsed, stats, errors
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    print(f"{threads} worker threads + 1 expiry thread, {seconds:.0f}s per run, expiry slice {EXPIRY_SLICE}")
+    failed = False
+    for shards in (1, SESSION_SHARDS):
+        throughput, stats, errors = run(shards, threads, seconds)
+        print(f"  shards={shards:<3} {throughput:10.0f} ops/s  expired {stats['expired']:>7} in {stats['calls']} calls"
+              f"  longest expiry call {stats['max_call'] * 1000:6.2f} ms  errors: {len(errors)}")
+        for error in errors[:5]:
+            print(f"    {error}")
+        failed = failed or bool(errors)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
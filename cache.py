@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Shared on-disk cache database (one table, rows partitioned by namespace)
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "cache.db")
+
+
+def sha256_file(path: str, chunk_size: int = 1 << 16) -> str:
+    """Return the hex SHA-256 digest of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TieredCache:
+    """
+    Two-tier key/value cache: an in-memory LRU backed by an optional SQLite table.
+
+    Entries expire after `ttl` seconds in both tiers. The memory tier is bounded
+    by `max_entries` (least recently used evicted first) and the disk tier by
+    `max_disk_entries` (least recently accessed evicted first). Values must be
+    JSON-serializable to be persisted.
+    """
+
+    def __init__(self, namespace: str, max_entries: int = 1024, ttl: float = 86400,
+                 db_path: Optional[str] = None, max_disk_entries: int = 100000):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if db_path:
+            try:
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute('''
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+                ''')
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Disk cache unavailable for '{namespace}', using memory only: {e}")
+                self._db = None
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None if absent or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if now - created_at <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+        row = self._disk_get(key, now)
+        if row is not None:
+            created_at, value = row
+            with self._lock:
+                self._stats["disk_hits"] += 1
+                self._memory_put(key, value, created_at)
+            return value
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value in both tiers"""
+        now = time.time()
+        with self._lock:
+            self._memory_put(key, value, now)
+        self._disk_put(key, value, now)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def _memory_put(self, key: str, value: Any, created_at: float) -> None:
+        # Caller holds self._lock
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[float, Any]]:
+        if self._db is None:
+            return None
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                ).fetchone()
+                if row is None:
+                    return None
+                if now - row[1] > self.ttl:
+                    self._db.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                                     (self.namespace, key))
+                    self._db.commit()
+                    return None
+                self._db.execute("UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                                 (now, self.namespace, key))
+                self._db.commit()
+            return row[1], json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Disk cache read failed for '{self.namespace}': {e}")
+            return None
+
+    def _disk_put(self, key: str, value: Any, now: float) -> None:
+        if self._db is None:
+            return
+        try:
+            payload = json.dumps(value)
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, value, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (self.namespace, key, payload, now, now)
+                )
+                self._writes_since_prune += 1
+                if self._writes_since_prune >= 100:
+                    self._writes_since_prune = 0
+                    self._prune(now)
+                self._db.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Disk cache write failed for '{self.namespace}': {e}")
+
+    def _prune(self, now: float) -> None:
+        # Caller holds self._db_lock; drop expired rows, then the least recently accessed overflow
+        self._db.execute("DELETE FROM cache_entries WHERE namespace = ? AND created_at < ?",
+                         (self.namespace, now - self.ttl))
+        self._db.execute('''
+        DELETE FROM cache_entries WHERE namespace = ? AND key IN (
+            SELECT key FROM cache_entries WHERE namespace = ?
+            ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+        )
+        ''', (self.namespace, self.namespace, self.max_disk_entries))
@@ -0,0 +1,407 @@
+import os
+import sys
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+CONVERSATION_STORE = os.getenv("CONVERSATION_STORE", "memory")  # "memory" or "sqlite"
+CONVERSATION_DB_PATH = os.getenv("CONVERSATION_DB_PATH", "conversations.db")
+MAX_READ_MESSAGES = int(os.getenv("CONVERSATION_MAX_READ_MESSAGES", 64))  # newest messages returned per read
+SESSION_SHARDS = int(os.getenv("CONVERSATION_SESSION_SHARDS", 16))  # lock stripes in the in-memory store
+EXPIRY_SLICE = int(os.getenv("CONVERSATION_EXPIRY_SLICE", 256))  # sessions expired per call (and per lock hold)
+TRIMMED_ROWS_PURGE_INTERVAL = 300  # seconds between bulk deletes of trimmed SQLite message rows
+
+# (sequence number of the first message returned, messages oldest first)
+MessageWindow = Tuple[int, List[Dict[str, str]]]
+
+# Roles are stored as one-byte codes; message dicts are only built on read
+ROLES = ("user", "assistant", "system")
+ROLE_CODES = {role: code for code, role in enumerate(ROLES)}
+META_FIELDS = ("source_language", "summary")
+
+
+class ConversationStore:
+    """
+    Storage backend for ConversationManager.
+
+    A session holds user/assistant messages, each with a per-session sequence
+    number, plus metadata (source_language, summary). Messages are only ever
+    appended; trimming moves the session's start past the dropped messages.
+    Every access refreshes the session's last-activity time.
+    """
+
+    name = "base"
+
+    def create(self, session_id: str) -> None:
+        """Create a session if it does not exist yet (an existing one is only touched)"""
+        raise NotImplementedError
+
+    def touch(self, session_id: str) -> bool:
+        """Refresh last activity; returns False if the session does not exist"""
+        raise NotImplementedError
+
+    def append(self, session_id: str, role: str, content: str) -> bool:
+        raise NotImplementedError
+
+    def messages(self, session_id: str, limit: Optional[int] = MAX_READ_MESSAGES) -> Optional[MessageWindow]:
+        """Return the newest `limit` (None: all) live messages, or None if the session does not exist"""
+        raise NotImplementedError
+
+    def trim_before(self, session_id: str, seq: int) -> bool:
+        """Drop messages with sequence numbers below seq"""
+        raise NotImplementedError
+
+    def get_meta(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return {"source_language", "summary"}, or None if the session does not exist"""
+        raise NotImplementedError
+
+    def set_meta(self, session_id: str, **fields: Any) -> bool:
+        raise NotImplementedError
+
+    def expire(self, timeout: float, limit: Optional[int] = None) -> int:
+        """Delete up to limit (default: all) sessions idle for longer than timeout seconds; returns how many"""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class _SessionRecord:
+    """Compact per-session state: role codes in a bytearray, contents in a parallel list"""
+
+    __slots__ = ("roles", "contents", "start_seq", "source_language", "summary", "last_activity")
+
+    def __init__(self):
+        self.roles = bytearray()
+        self.contents: List[str] = []
+        self.start_seq = 0  # sequence number of contents[0]
+        self.source_language: Optional[str] = None
+        self.summary: Optional[str] = None
+        self.last_activity = time.time()
+
+
+class _Shard:
+    """One stripe of the session map: sessions in last-activity order, behind their own lock"""
+
+    __slots__ = ("sessions", "lock")
+
+    def __init__(self):
+        self.sessions: "OrderedDict[str, _SessionRecord]" = OrderedDict()
+        self.lock = threading.Lock()
+
+
+class InMemoryConversationStore(ConversationStore):
+    """
+    Process-local store, striped across `shards` OrderedDicts with one lock each.
+
+    A session always lives in the shard picked by its ID hash, so requests for
+    different sessions rarely contend. Each shard is kept in last-activity
+    order, which is the time-ordered index expiry walks: it only visits the
+    expired prefix, a bounded slice at a time. max_sessions is enforced per
+    shard (max_sessions / shards), evicting that shard's least recently
+    active session. Sessions are slotted records rather than dicts, and each
+    message costs one role byte plus its content string.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_sessions: int = 10000, shards: int = SESSION_SHARDS):
+        self.max_sessions = max_sessions
+        self._shards = [_Shard() for _ in range(shards)]
+        self._shard_capacity = max(1, -(-max_sessions // shards))
+        self._next_expiry_shard = 0  # round-robin start, so a limited slice does not always favour shard 0
+
+    def _shard(self, session_id: str) -> _Shard:
+        return self._shards[hash(session_id) % len(self._shards)]
+
+    @staticmethod
+    def _get(shard: _Shard, session_id: str) -> Optional[_SessionRecord]:
+        # Caller holds shard.lock
+        session = shard.sessions.get(session_id)
+        if session is not None:
+            session.last_activity = time.time()
+            shard.sessions.move_to_end(session_id)
+        return session
+
+    def create(self, session_id: str) -> None:
+        shard = self._shard(session_id)
+        with shard.lock:
+            if self._get(shard, session_id) is not None:
+                return
+            shard.sessions[session_id] = _SessionRecord()
+            while len(shard.sessions) > self._shard_capacity:
+                evicted_id, _ = shard.sessions.popitem(last=False)
+                logger.info(f"Evicted least recently used session {evicted_id}")
+
+    def touch(self, session_id: str) -> bool:
+        shard = self._shard(session_id)
+        with shard.lock:
+            return self._get(shard, session_id) is not None
+
+    def append(self, session_id: str, role: str, content: str) -> bool:
+        shard = self._shard(session_id)
+        with shard.lock:
+            session = self._get(shard, session_id)
+            if session is None:
+                return False
+            session.roles.append(ROLE_CODES[role])
+            session.contents.append(content)
+            return True
+
+    def messages(self, session_id: str, limit: Optional[int] = MAX_READ_MESSAGES) -> Optional[MessageWindow]:
+        shard = self._shard(session_id)
+        with shard.lock:
+            session = self._get(shard, session_id)
+            if session is None:
+                return None
+            start = 0 if limit is None else max(len(session.contents) - limit, 0)
+            window = [{"role": ROLES[code], "content": content}
+                      for code, content in zip(session.roles[start:], session.contents[start:])]
+            return session.start_seq + start, window
+
+    def trim_before(self, session_id: str, seq: int) -> bool:
+        shard = self._shard(session_id)
+        with shard.lock:
+            session = self._get(shard, session_id)
+            if session is None:
+                return False
+            drop = seq - session.start_seq
+            if drop > 0:
+                del session.roles[:drop]
+                del session.contents[:drop]
+                session.start_seq += drop
+            return True
+
+    def get_meta(self, session_id: str) -> Optional[Dict[str, Any]]:
+        shard = self._shard(session_id)
+        with shard.lock:
+            session = self._get(shard, session_id)
+            if session is None:
+                return None
+            return {"source_language": session.source_language, "summary": session.summary}
+
+    def set_meta(self, session_id: str, **fields: Any) -> bool:
+        shard = self._shard(session_id)
+        with shard.lock:
+            session = self._get(shard, session_id)
+            if session is None:
+                return False
+            for name, value in fields.items():
+                if name not in META_FIELDS:
+                    continue
+                if name == "source_language" and value is not None:
+                    value = sys.intern(value)  # a handful of codes shared by every session
+                setattr(session, name, value)
+            return True
+
+    def expire(self, timeout: float, limit: Optional[int] = None) -> int:
+        cutoff = time.time() - timeout
+        expired = 0
+        count = len(self._shards)
+        start = self._next_expiry_shard
+        for offset in range(count):
+            index = (start + offset) % count
+            shard = self._shards[index]
+            # Each lock hold removes at most EXPIRY_SLICE sessions, so requests on this shard never wait long
+            while True:
+                batch = EXPIRY_SLICE if limit is None else min(EXPIRY_SLICE, limit - expired)
+                if batch <= 0:
+                    self._next_expiry_shard = index  # resume here on the next call
+                    return expired
+                removed = 0
+                with shard.lock:
+                    while removed < batch and shard.sessions:
+                        session_id, session = next(iter(shard.sessions.items()))
+                        if session.last_activity >= cutoff:
+                            break
+                        del shard.sessions[session_id]
+                        removed += 1
+                expired += removed
+                if removed < batch:
+                    break
+        self._next_expiry_shard = (start + 1) % count
+        return expired
+
+    def __len__(self) -> int:
+        return sum(len(shard.sessions) for shard in self._shards)
+
+
+class SQLiteConversationStore(ConversationStore):
+    """
+    Store shared by every worker process on a host, in an SQLite database in WAL mode.
+
+    Messages are insert-only rows keyed by (session_id, seq); trimming only
+    advances the session's start_seq, and rows below it are deleted in bulk
+    by expire(). Reads fetch at most `limit` rows through the primary key.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, db_path: str = CONVERSATION_DB_PATH, max_sessions: int = 100000):
+        self.max_sessions = max_sessions
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+        self._lock = threading.Lock()
+        self._last_purge = float("-inf")
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute('''
+            CREATE TABLE IF NOT EXISTS conversation_sessions (
+                session_id TEXT PRIMARY KEY,
+                start_seq INTEGER NOT NULL DEFAULT 0,
+                source_language TEXT,
+                summary TEXT,
+                last_activity REAL NOT NULL
+            )
+            ''')
+            self._db.execute('''
+            CREATE TABLE IF NOT EXISTS conversation_messages (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            )
+            ''')
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_conversation_sessions_activity "
+                             "ON conversation_sessions (last_activity)")
+            self._db.commit()
+
+    def _touch(self, session_id: str) -> bool:
+        # Caller holds self._lock
+        cursor = self._db.execute("UPDATE conversation_sessions SET last_activity = ? WHERE session_id = ?",
+                                  (time.time(), session_id))
+        return cursor.rowcount > 0
+
+    def create(self, session_id: str) -> None:
+        with self._lock:
+            if not self._touch(session_id):
+                # OR IGNORE: another worker may have created it in the meantime
+                self._db.execute(
+                    "INSERT OR IGNORE INTO conversation_sessions (session_id, start_seq, last_activity) VALUES (?, 0, ?)",
+                    (session_id, time.time())
+                )
+            self._db.commit()
+
+    def touch(self, session_id: str) -> bool:
+        with self._lock:
+            exists = self._touch(session_id)
+            self._db.commit()
+            return exists
+
+    def append(self, session_id: str, role: str, content: str) -> bool:
+        with self._lock:
+            if not self._touch(session_id):
+                self._db.commit()
+                return False
+            # One statement, so concurrent writers from other processes cannot take the same seq
+            self._db.execute('''
+            INSERT INTO conversation_messages (session_id, seq, role, content)
+            SELECT ?, MAX(
+                COALESCE((SELECT MAX(seq) + 1 FROM conversation_messages WHERE session_id = ?), 0),
+                (SELECT start_seq FROM conversation_sessions WHERE session_id = ?)
+            ), ?, ?
+            ''', (session_id, session_id, session_id, role, content))
+            self._db.commit()
+            return True
+
+    def messages(self, session_id: str, limit: Optional[int] = MAX_READ_MESSAGES) -> Optional[MessageWindow]:
+        with self._lock:
+            if not self._touch(session_id):
+                self._db.commit()
+                return None
+            self._db.commit()
+            rows = self._db.execute('''
+            SELECT seq, role, content FROM conversation_messages
+            WHERE session_id = ? AND seq >= (SELECT start_seq FROM conversation_sessions WHERE session_id = ?)
+            ORDER BY seq DESC LIMIT ?
+            ''', (session_id, session_id, -1 if limit is None else limit)).fetchall()
+        rows.reverse()
+        if not rows:
+            return 0, []
+        return rows[0][0], [{"role": role, "content": content} for _, role, content in rows]
+
+    def trim_before(self, session_id: str, seq: int) -> bool:
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE conversation_sessions SET start_seq = MAX(start_seq, ?), last_activity = ? WHERE session_id = ?",
+                (seq, time.time(), session_id)
+            )
+            self._db.commit()
+            return cursor.rowcount > 0
+
+    def get_meta(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._touch(session_id)
+            self._db.commit()
+            row = self._db.execute(
+                "SELECT source_language, summary FROM conversation_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"source_language": row[0], "summary": row[1]}
+
+    def set_meta(self, session_id: str, **fields: Any) -> bool:
+        columns = [name for name in fields if name in META_FIELDS]
+        if not columns:
+            return self.touch(session_id)
+        assignments = ", ".join(f"{name} = ?" for name in columns)
+        with self._lock:
+            cursor = self._db.execute(
+                f"UPDATE conversation_sessions SET {assignments}, last_activity = ? WHERE session_id = ?",
+                [fields[name] for name in columns] + [time.time(), session_id]
+            )
+            self._db.commit()
+            return cursor.rowcount > 0
+
+    def expire(self, timeout: float, limit: Optional[int] = None) -> int:
+        """
+        Delete the oldest idle sessions and sessions beyond max_sessions (up to
+        limit per call), with their messages. Trimmed message rows are purged
+        in bulk at most every TRIMMED_ROWS_PURGE_INTERVAL seconds.
+        """
+        cutoff = time.time() - timeout
+        with self._lock:
+            expired_ids = self._db.execute('''
+            SELECT session_id FROM conversation_sessions WHERE last_activity < ? OR session_id IN (
+                SELECT session_id FROM conversation_sessions
+                ORDER BY last_activity DESC LIMIT -1 OFFSET ?
+            )
+            ORDER BY last_activity LIMIT ?
+            ''', (cutoff, self.max_sessions, -1 if limit is None else limit)).fetchall()
+            self._db.executemany("DELETE FROM conversation_sessions WHERE session_id = ?", expired_ids)
+            self._db.executemany("DELETE FROM conversation_messages WHERE session_id = ?", expired_ids)
+            if time.monotonic() - self._last_purge >= TRIMMED_ROWS_PURGE_INTERVAL:
+                self._last_purge = time.monotonic()
+                self._db.execute('''
+                DELETE FROM conversation_messages WHERE NOT EXISTS (
+                    SELECT 1 FROM conversation_sessions s
+                    WHERE s.session_id = conversation_messages.session_id AND conversation_messages.seq >= s.start_seq
+                )
+                ''')
+            self._db.commit()
+        return len(expired_ids)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM conversation_sessions").fetchone()[0]
+
+
+CONVERSATION_STORES: Dict[str, Type[ConversationStore]] = {
+    InMemoryConversationStore.name: InMemoryConversationStore,
+    SQLiteConversationStore.name: SQLiteConversationStore,
+}
+
+
+def create_conversation_store(name: Optional[str] = None, **kwargs: Any) -> ConversationStore:
+    """Instantiate the store registered under name (default: CONVERSATION_STORE)"""
+    name = name or CONVERSATION_STORE
+    if name not in CONVERSATION_STORES:
+        raise ValueError(f"Unknown conversation store '{name}'. Available: {', '.join(CONVERSATION_STORES)}")
+    return CONVERSATION_STORES[name](**kwargs)
@@ -1,19 +1,48 @@
 import os
+import json
 import time
-import requests
+import mimetypes
+import heapq
+import itertools
+import threading
+import wave
+from typing import List, NamedTuple, Optional
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+
+# Sibling modules resolve both as a package (see __init__.py) and as flat top-level modules (app.py)
+if __package__:
+    from .http_client import get_http_pool
+else:
+    from http_client import get_http_pool
 
 API_KEY = "enter_your_own_api_key"
 UPLOAD_URL = 'https://api.gladia.io/v2/upload'
 TRANSCRIPTION_URL = 'https://api.gladia.io/v2/transcription'
-POLL_INTERVAL = 5  # seconds between polling
+POLL_INTERVAL = 5  # maximum seconds between polls of a single job
 MAX_RETRIES = 60  # maximum number of retries (5 minutes total)
+MIN_POLL_INTERVAL = 0.5  # first poll delay for very short clips
+POLL_BACKOFF = 1.5  # growth factor applied to the interval after every poll
+PROCESSING_RATIO = 0.25  # rough Gladia processing time per second of audio
+POLL_WORKERS = 4  # concurrent status requests issued by the shared poller
+TRANSCRIPTION_TIMEOUT = POLL_INTERVAL * MAX_RETRIES
+CALLBACK_SECRET = os.getenv('GLADIA_CALLBACK_SECRET')  # token the /gladia/callback route requires
+# Public URL of the /gladia/callback route; callback mode stays off unless the route is protected by a secret
+CALLBACK_URL = os.getenv('GLADIA_CALLBACK_URL') if CALLBACK_SECRET else None
+if os.getenv('GLADIA_CALLBACK_URL') and not CALLBACK_SECRET:
+    print("GLADIA_CALLBACK_URL is set without GLADIA_CALLBACK_SECRET; callback mode disabled, polling instead.")
+CALLBACK_FALLBACK_DELAY = 30  # safety-net poll in case a callback never arrives
+EARLY_CALLBACK_TTL = 60  # seconds to keep callbacks that arrive before the job is tracked
+BATCH_CONCURRENCY = 4  # default number of files transcribed at once by transcribe_many
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.ogg', '.flac', '.m4a', '.webm')
 
 def upload_audio(filename):
     headers = {'x-gladia-key': API_KEY}
-    files = {'audio': (filename, open(filename, 'rb'), 'audio/wav')}
     
     try:
-        response = requests.post(UPLOAD_URL, headers=headers, files=files)
+        with open(filename, 'rb') as audio_file:
+            content_type = mimetypes.guess_type(filename)[0] or 'audio/wav'
+            files = {'audio': (os.path.basename(filename), audio_file, content_type)}
+            response = get_http_pool().post(UPLOAD_URL, headers=headers, files=files)
         response.raise_for_status()
         
         audio_url = response.json().get('audio_url')
@@ -23,11 +52,8 @@ def upload_audio(filename):
         print(f"Failed to upload audio: {str(e)}")
         return None
 
-def request_transcription(audio_url):
-    headers = {
-        'Content-Type': 'application/json',
-        'x-gladia-key': API_KEY
-    }
+def build_transcription_request(audio_url, callback_url=None):
+    """Request body for a pre-recorded transcription job."""
     data = {
         "audio_url": audio_url,
         "sentences": False,
@@ -53,9 +79,21 @@ def request_transcription(audio_url):
         "skip_channel_deduplication": False,
         "structured_data_extraction": False
     }
+    if callback_url:
+        # Gladia POSTs the finished result here instead of us polling for it
+        data["callback"] = True
+        data["callback_config"] = {"url": callback_url, "method": "POST"}
+    return data
+
+def request_transcription(audio_url, callback_url=None):
+    headers = {
+        'Content-Type': 'application/json',
+        'x-gladia-key': API_KEY
+    }
+    data = build_transcription_request(audio_url, callback_url)
     
     try:
-        response = requests.post(TRANSCRIPTION_URL, headers=headers, json=data)
+        response = get_http_pool().post(TRANSCRIPTION_URL, headers=headers, json=data)
         response.raise_for_status()
         
         job_id = response.json().get('id')
@@ -65,39 +103,219 @@ def request_transcription(audio_url):
         print(f"Failed to request transcription: {str(e)}")
         return None
 
-def check_transcription_status(job_id):
+def estimate_audio_duration(filename):
+    """Return the clip length in seconds, or None when it cannot be determined."""
+    try:
+        with wave.open(filename, 'rb') as wav_file:
+            return wav_file.getnframes() / float(wav_file.getframerate())
+    except Exception:
+        pass
+    try:
+        import soundfile
+        return soundfile.info(filename).duration
+    except Exception:
+        pass
+    try:
+        # Assume ~128 kbit/s compressed audio as a last resort
+        return os.path.getsize(filename) / 16000.0
+    except OSError:
+        return None
+
+def initial_poll_delay(audio_duration=None):
+    """First poll delay for a job, scaled to the expected processing time of the clip."""
+    if not audio_duration:
+        return MIN_POLL_INTERVAL * 2
+    return min(max(audio_duration * PROCESSING_RATIO, MIN_POLL_INTERVAL), POLL_INTERVAL)
+
+def next_poll_delay(previous_delay):
+    """Back off geometrically as a job ages, never exceeding POLL_INTERVAL."""
+    return min(previous_delay * POLL_BACKOFF, POLL_INTERVAL)
+
+def fetch_transcription(job_id):
+    """Fetch the current state of a transcription job (single GET, no waiting)."""
     headers = {'x-gladia-key': API_KEY}
-    get_url = f"https://api.gladia.io/v2/transcription/{job_id}"
-    
-    retries = 0
-    while retries < MAX_RETRIES:
+    get_url = f"{TRANSCRIPTION_URL}/{job_id}"
+    response = get_http_pool().get(get_url, headers=headers)
+    response.raise_for_status()
+    return response.json()
+
+class _PolledJob:
+    __slots__ = ('job_id', 'future', 'delay', 'deadline', 'polls')
+
+    def __init__(self, job_id, future, delay, deadline):
+        self.job_id = job_id
+        self.future = future
+        self.delay = delay
+        self.deadline = deadline
+        self.polls = 0
+
+class TranscriptionPoller:
+    """
+    Single background poller shared by every outstanding transcription job.
+
+    Jobs are kept in a heap ordered by their next due time; one scheduler
+    thread hands due jobs to a small worker pool, so waiting callers only
+    block on a Future instead of each looping with time.sleep.
+    """
+
+    def __init__(self, workers=POLL_WORKERS, timeout=TRANSCRIPTION_TIMEOUT):
+        self.timeout = timeout
+        self._jobs = {}
+        self._early_results = {}
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='gladia-poll')
+        self._thread = None
+
+    def submit(self, job_id, audio_duration=None, first_delay=None):
+        """
+        Start tracking a job and return a Future resolving to the result dict (or None).
+
+        first_delay overrides the adaptive first poll; callback-mode jobs use it
+        to poll only as a late safety net.
+        """
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return job.future
+            early = self._early_results.pop(job_id, None)
+            if early is not None:
+                future = Future()
+                future.set_result(early[1])
+                return future
+            delay = initial_poll_delay(audio_duration)
+            job = _PolledJob(job_id, Future(), delay, time.monotonic() + self.timeout)
+            self._jobs[job_id] = job
+            self._schedule(job, delay if first_delay is None else first_delay)
+            self._ensure_thread()
+            return job.future
+
+    def resolve(self, job_id, result):
+        """Complete a job from outside the poll loop, e.g. from a completion callback."""
+        with self._cond:
+            job = self._jobs.pop(job_id, None)
+            if job is None:
+                # The callback beat request_transcription's return; keep it for submit()
+                now = time.monotonic()
+                self._early_results = {k: v for k, v in self._early_results.items()
+                                       if now - v[0] < EARLY_CALLBACK_TTL}
+                self._early_results[job_id] = (now, result)
+                return False
+        if not job.future.done():
+            job.future.set_result(result)
+        return True
+
+    def pending(self):
+        with self._cond:
+            return len(self._jobs)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='gladia-poller', daemon=True)
+            self._thread.start()
+
+    def _schedule(self, job, delay):
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._counter), job.job_id))
+        self._cond.notify()
+
+    def _finish(self, job, result):
+        with self._cond:
+            self._jobs.pop(job.job_id, None)
+        if not job.future.done():
+            job.future.set_result(result)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                due, _, job_id = self._heap[0]
+                wait_time = due - time.monotonic()
+                if wait_time > 0:
+                    self._cond.wait(wait_time)
+                    continue
+                heapq.heappop(self._heap)
+                job = self._jobs.get(job_id)
+            if job is not None:
+                self._executor.submit(self._poll, job)
+
+    def _poll(self, job):
+        if job.future.done():
+            return
+        job.polls += 1
         try:
-            response = requests.get(get_url, headers=headers)
-            response.raise_for_status()
-            
-            result = response.json()
+            result = fetch_transcription(job.job_id)
             status = result.get('status')
-            
+
             # The API returns 'done' when complete, not 'completed'
             if status == "done":
-                print("Transcription completed.")
-                return result
+                print(f"Transcription {job.job_id} completed after {job.polls} polls.")
+                self._finish(job, result)
+                return
             elif status == "error" or result.get('error_code'):
                 error_message = result.get('error_code', 'Unknown error')
                 print(f"Transcription failed: {error_message}")
-                return None
+                self._finish(job, None)
+                return
             else:  # queued or processing
-                print(f"Transcription in progress ({retries+1}/{MAX_RETRIES}). Status: {status}. Retrying in {POLL_INTERVAL} seconds...")
-                time.sleep(POLL_INTERVAL)
-                retries += 1
-                
+                print(f"Transcription {job.job_id} in progress (poll {job.polls}). Status: {status}. Retrying in {job.delay:.1f} seconds...")
         except Exception as e:
             print(f"Error checking transcription: {str(e)}")
-            time.sleep(POLL_INTERVAL)
-            retries += 1
-    
-    print(f"Timeout after {MAX_RETRIES} retries.")
-    return None
+
+        if time.monotonic() + job.delay > job.deadline:
+            print(f"Timeout after {job.polls} polls.")
+            self._finish(job, None)
+            return
+
+        delay = job.delay
+        job.delay = next_poll_delay(delay)
+        with self._cond:
+            self._schedule(job, delay)
+
+_poller = None
+_poller_lock = threading.Lock()
+
+def get_poller():
+    """Return the process-wide TranscriptionPoller, creating it on first use."""
+    global _poller
+    with _poller_lock:
+        if _poller is None:
+            _poller = TranscriptionPoller()
+        return _poller
+
+def handle_callback(payload):
+    """
+    Wake the request waiting on a job from a Gladia completion callback.
+
+    Returns the job id the callback referred to, or None if the payload was not understood.
+    """
+    if not isinstance(payload, dict):
+        return None
+    job_id = payload.get('id') or payload.get('request_id')
+    if not job_id:
+        return None
+
+    event = payload.get('event', '')
+    if event.endswith('error') or payload.get('error_code'):
+        print(f"Transcription {job_id} failed (callback): {payload.get('error_code', event)}")
+        result = None
+    else:
+        # Callbacks carry the same body as the "result" field of a GET on the job
+        result = {'id': job_id, 'status': 'done', 'result': payload.get('payload') or payload.get('result') or {}}
+        print(f"Transcription {job_id} completed (callback).")
+
+    get_poller().resolve(job_id, result)
+    return job_id
+
+def check_transcription_status(job_id, audio_duration=None, callback=False):
+    first_delay = CALLBACK_FALLBACK_DELAY if callback else None
+    future = get_poller().submit(job_id, audio_duration, first_delay=first_delay)
+    try:
+        return future.result(timeout=TRANSCRIPTION_TIMEOUT + POLL_INTERVAL)
+    except FutureTimeoutError:
+        print(f"Timeout waiting for transcription {job_id}.")
+        return None
 
 def find_in_dict(data, key, path=''):
     """Recursively search for a key in a nested dictionary."""
@@ -117,72 +335,151 @@ def find_in_dict(data, key, path=''):
                     return result, found_path
     return None, ''
 
-def transcribe_audio(file_path):
+# Keys searched for anywhere in a response when they are not at their expected location
+EXTRACT_KEYS = ('full_transcript', 'language', 'detected_language', 'spoken_language', 'locale')
+
+# Response schema signature -> {key: path at which it was last found}
+_path_cache = {}
+_path_cache_lock = threading.Lock()
+_MISSING = object()
+
+class TranscriptionResult(NamedTuple):
+    transcript: Optional[str]
+    languages: List[str]
+
+    @property
+    def language_str(self) -> str:
+        return ', '.join(self.languages) if self.languages else 'Unknown'
+
+def collect_keys(data, keys=EXTRACT_KEYS):
+    """
+    Find several keys in one traversal.
+
+    Returns {key: (value, path)} for the first non-None occurrence of each key,
+    in the same depth-first order find_in_dict uses; stops early once all are found.
+    """
+    found = {}
+    wanted = len(keys)
+
+    def visit(node, path):
+        if isinstance(node, dict):
+            for key in keys:
+                if key not in found:
+                    value = node.get(key)
+                    if value is not None:
+                        found[key] = (value, path + (key,))
+            if len(found) == wanted:
+                return True
+            for k, v in node.items():
+                if isinstance(v, (dict, list)) and visit(v, path + (k,)):
+                    return True
+        else:
+            for i, item in enumerate(node):
+                if isinstance(item, (dict, list)) and visit(item, path + (i,)):
+                    return True
+        return False
+
+    if isinstance(data, (dict, list)):
+        visit(data, ())
+    return found
+
+def _follow_path(data, path):
+    try:
+        for step in path:
+            data = data[step]
+        return data
+    except (KeyError, IndexError, TypeError):
+        return _MISSING
+
+def _schema_signature(data):
+    result = data.get('result') if isinstance(data.get('result'), dict) else {}
+    transcription = result.get('transcription') if isinstance(result.get('transcription'), dict) else {}
+    return tuple(data), tuple(result), tuple(transcription)
+
+class _FieldLookup:
+    """Per-response key lookup: cached paths first, at most one full traversal on a miss."""
+
+    def __init__(self, data):
+        self.data = data
+        self.signature = _schema_signature(data)
+        with _path_cache_lock:
+            self.paths = dict(_path_cache.get(self.signature, {}))
+        self.scanned = None
+
+    def get(self, key):
+        path = self.paths.get(key)
+        if path is not None:
+            value = _follow_path(self.data, path)
+            if value is not _MISSING and value is not None:
+                return value
+        if self.scanned is None:
+            self.scanned = collect_keys(self.data)
+            learned = {k: found_path for k, (_, found_path) in self.scanned.items()}
+            with _path_cache_lock:
+                if len(_path_cache) > 64 and self.signature not in _path_cache:
+                    _path_cache.clear()
+                _path_cache.setdefault(self.signature, {}).update(learned)
+        hit = self.scanned.get(key)
+        return hit[0] if hit else None
+
+def parse_transcription_result(transcription_result):
+    """Pull the transcript and detected languages out of a completed job as a TranscriptionResult."""
+    transcription = transcription_result.get('result', {}).get('transcription', {})
+    lookup = _FieldLookup(transcription_result)
+
+    # Extract transcript from result.transcription.full_transcript, else wherever it is
+    transcript = transcription.get('full_transcript') or lookup.get('full_transcript')
+
+    # Look for language information in the known locations, then anywhere in the response
+    language = (transcription.get('language')
+                or transcription.get('detected_language')
+                or transcription_result.get('result', {}).get('metadata', {}).get('language')
+                or lookup.get('language')
+                or lookup.get('detected_language')
+                or lookup.get('spoken_language'))
+
+    # Ensure language is in a list format
+    if language:
+        if isinstance(language, str):
+            languages = [language]
+        elif isinstance(language, list):
+            languages = language
+        else:
+            languages = []
+    else:
+        # If no language was found, infer it from locale information
+        locale = lookup.get('locale')
+        if locale and isinstance(locale, str):
+            languages = [locale.split('-')[0]]  # e.g., extract 'en' from 'en-US'
+        else:
+            languages = []
+
+    return TranscriptionResult(transcript, languages)
+
+def extract_transcription(transcription_result):
+    """Pull (transcript, language_str) out of a completed transcription job."""
+    parsed = parse_transcription_result(transcription_result)
+    return parsed.transcript, parsed.language_str
+
+def transcribe_audio(file_path, callback_url=None):
     print(f"Starting transcription for: {file_path}")
+    callback_url = callback_url or CALLBACK_URL
     
     audio_url = upload_audio(file_path)
     if not audio_url:
         print("Failed to upload audio.")
         return None, None
     
-    job_id = request_transcription(audio_url)
+    job_id = request_transcription(audio_url, callback_url)
     if not job_id:
         print("Failed to request transcription.")
         return None, None
     
-    transcription_result = check_transcription_status(job_id)
+    transcription_result = check_transcription_status(job_id, estimate_audio_duration(file_path),
+                                                      callback=bool(callback_url))
     if transcription_result:
         try:
-            # Extract transcript from result.transcription.full_transcript
-            transcript = transcription_result.get('result', {}).get('transcription', {}).get('full_transcript')
-            
-            if not transcript:
-                # If not found in the expected location, search through the entire response
-                transcript, path = find_in_dict(transcription_result, 'full_transcript')
-                print(f"Found transcript at: {path}")
-            
-            # Look for language information in several possible locations
-            language = None
-            
-            # Try the primary location first
-            language = transcription_result.get('result', {}).get('transcription', {}).get('language')
-            
-            # If not found, try the detected_language field
-            if not language:
-                language = transcription_result.get('result', {}).get('transcription', {}).get('detected_language')
-            
-            # If still not found, try metadata
-            if not language:
-                language = transcription_result.get('result', {}).get('metadata', {}).get('language')
-            
-            # If still not found, search for any field with "language" in its name
-            if not language:
-                for field in ['language', 'detected_language', 'spoken_language']:
-                    language_value, path = find_in_dict(transcription_result, field)
-                    if language_value:
-                        language = language_value
-                        print(f"Found language at: {path}")
-                        break
-            
-            # Ensure language is in a list format
-            if language:
-                if isinstance(language, str):
-                    languages = [language]
-                elif isinstance(language, list):
-                    languages = language
-                else:
-                    languages = []
-            else:
-                # If no language was found, try to infer it from other data
-                # Such as locale or region information
-                locale, _ = find_in_dict(transcription_result, 'locale')
-                if locale and isinstance(locale, str):
-                    languages = [locale.split('-')[0]]  # e.g., extract 'en' from 'en-US'
-                else:
-                    languages = []
-            
-            language_str = ', '.join(languages) if languages else 'Unknown'
-            
+            transcript, language_str = extract_transcription(transcription_result)
             print(f"Transcription completed. Detected language(s): {language_str}")
             return transcript, language_str
         except Exception as e:
@@ -194,22 +491,111 @@ def transcribe_audio(file_path):
         print("Failed to get transcription result.")
         return None, None
 
+def iter_transcriptions(paths, max_concurrency=BATCH_CONCURRENCY):
+    """
+    Transcribe many files with at most max_concurrency jobs in flight.
+
+    Yields (path, transcript, language) tuples in completion order.
+    """
+    executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='gladia-batch')
+    try:
+        futures = {executor.submit(transcribe_audio, path): path for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                transcript, language = future.result()
+            except Exception as e:
+                print(f"Transcription of {path} raised: {str(e)}")
+                transcript, language = None, None
+            yield path, transcript, language
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def transcribe_many(paths, max_concurrency=BATCH_CONCURRENCY):
+    """Transcribe many files concurrently. Returns {path: (transcript, language)}."""
+    return {path: (transcript, language)
+            for path, transcript, language in iter_transcriptions(paths, max_concurrency)}
+
+def load_manifest(manifest_path):
+    """Return {path: entry} for every file already transcribed successfully in a JSONL manifest."""
+    completed = {}
+    if not os.path.exists(manifest_path):
+        return completed
+    with open(manifest_path, 'r', encoding='utf-8') as manifest:
+        for line in manifest:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by an interrupted run
+            if entry.get('transcript'):
+                completed[entry['path']] = entry
+    return completed
+
+def transcribe_directory(directory, manifest_path=None, max_concurrency=BATCH_CONCURRENCY,
+                         extensions=AUDIO_EXTENSIONS):
+    """
+    Transcribe every audio file under a directory, recording results in a JSONL manifest.
+
+    Files already transcribed successfully in the manifest are skipped, so an
+    interrupted run can simply be started again. Returns (succeeded, failed) counts.
+    """
+    manifest_path = manifest_path or os.path.join(directory, 'transcripts.jsonl')
+    completed = load_manifest(manifest_path)
+
+    paths = []
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.lower().endswith(tuple(extensions)):
+                path = os.path.join(root, name)
+                if path not in completed:
+                    paths.append(path)
+    paths.sort()
+    print(f"{len(paths)} files to transcribe ({len(completed)} already in {manifest_path}).")
+
+    succeeded = failed = 0
+    with open(manifest_path, 'a', encoding='utf-8') as manifest:
+        for path, transcript, language in iter_transcriptions(paths, max_concurrency):
+            if transcript:
+                succeeded += 1
+            else:
+                failed += 1
+            manifest.write(json.dumps({
+                'path': path,
+                'transcript': transcript,
+                'language': language,
+                'completed_at': time.time()
+            }, ensure_ascii=False) + '\n')
+            manifest.flush()
+            print(f"[{succeeded + failed}/{len(paths)}] {'ok' if transcript else 'FAILED'}: {path}")
+    return succeeded, failed
+
 # Example usage
 if __name__ == "__main__":
-    import sys
-    
-    if len(sys.argv) > 1:
-        file_path = sys.argv[1]
-    else:
-        file_path = input("Enter the path to your audio file: ")
-    
-    transcript, languages = transcribe_audio(file_path)
-    
-    if transcript:
-        print("\nTranscription:")
-        print("-" * 80)
-        print(transcript)
-        print("-" * 80)
-        print(f"Detected language(s): {languages}")
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Transcribe an audio file, or every audio file in a directory, with Gladia.")
+    parser.add_argument('path', nargs='?', help="audio file or directory")
+    parser.add_argument('--concurrency', type=int, default=BATCH_CONCURRENCY,
+                        help="files transcribed at once in directory mode")
+    parser.add_argument('--manifest', help="JSONL manifest for directory mode (default: <directory>/transcripts.jsonl)")
+    args = parser.parse_args()
+
+    file_path = args.path or input("Enter the path to your audio file: ")
+
+    if os.path.isdir(file_path):
+        succeeded, failed = transcribe_directory(file_path, args.manifest, args.concurrency)
+        print(f"Done: {succeeded} transcribed, {failed} failed.")
     else:
-        print("Transcription failed.")
\ No newline at end of file
+        transcript, languages = transcribe_audio(file_path)
+        
+        if transcript:
+            print("\nTranscription:")
+            print("-" * 80)
+            print(transcript)
+            print("-" * 80)
+            print(f"Detected language(s): {languages}")
+        else:
+            print("Transcription failed.")
@@ -0,0 +1,182 @@
+import os
+import time
+import asyncio
+import weakref
+import mimetypes
+import aiohttp
+
+# Same dual import as gladia_api: works inside the package and as a top-level module
+if __package__:
+    from . import gladia_api
+    from .gladia_api import (
+        UPLOAD_URL,
+        TRANSCRIPTION_URL,
+        TRANSCRIPTION_TIMEOUT,
+        build_transcription_request,
+        extract_transcription,
+        estimate_audio_duration,
+        initial_poll_delay,
+        next_poll_delay
+    )
+else:
+    import gladia_api
+    from gladia_api import (
+        UPLOAD_URL,
+        TRANSCRIPTION_URL,
+        TRANSCRIPTION_TIMEOUT,
+        build_transcription_request,
+        extract_transcription,
+        estimate_audio_duration,
+        initial_poll_delay,
+        next_poll_delay
+    )
+
+ASYNC_POOL_SIZE = int(os.getenv("GLADIA_ASYNC_POOL_SIZE", 100))  # connections shared by all coroutines
+ASYNC_TIMEOUT = aiohttp.ClientTimeout(total=120, connect=5)
+
+# aiohttp sessions are bound to the event loop they were created on
+_sessions = weakref.WeakKeyDictionary()
+
+def get_session():
+    """Return the pooled ClientSession for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=ASYNC_POOL_SIZE, keepalive_timeout=30)
+        session = aiohttp.ClientSession(connector=connector, timeout=ASYNC_TIMEOUT)
+        _sessions[loop] = session
+    return session
+
+async def close_session():
+    """Close the running loop's session; call before the loop shuts down."""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+def _read_file(filename):
+    with open(filename, 'rb') as audio_file:
+        return audio_file.read()
+
+async def upload_audio_async(filename):
+    headers = {'x-gladia-key': gladia_api.API_KEY}
+
+    try:
+        audio_bytes = await asyncio.to_thread(_read_file, filename)
+        form = aiohttp.FormData()
+        form.add_field('audio', audio_bytes, filename=os.path.basename(filename),
+                       content_type=mimetypes.guess_type(filename)[0] or 'audio/wav')
+        async with get_session().post(UPLOAD_URL, headers=headers, data=form) as response:
+            response.raise_for_status()
+            audio_url = (await response.json()).get('audio_url')
+        print(f"Audio uploaded. URL: {audio_url}")
+        return audio_url
+    except Exception as e:
+        print(f"Failed to upload audio: {str(e)}")
+        return None
+
+async def request_transcription_async(audio_url, callback_url=None):
+    headers = {
+        'Content-Type': 'application/json',
+        'x-gladia-key': gladia_api.API_KEY
+    }
+    data = build_transcription_request(audio_url, callback_url)
+
+    try:
+        async with get_session().post(TRANSCRIPTION_URL, headers=headers, json=data) as response:
+            response.raise_for_status()
+            job_id = (await response.json()).get('id')
+        print(f"Transcription requested. Job ID: {job_id}")
+        return job_id
+    except Exception as e:
+        print(f"Failed to request transcription: {str(e)}")
+        return None
+
+async def _await_callback(job_id, audio_duration=None):
+    # handle_callback() (the /gladia/callback route) resolves the shared poller's future for this job;
+    # the poller only polls as a late safety net, as for synchronous callback-mode jobs
+    future = gladia_api.get_poller().submit(job_id, audio_duration, first_delay=gladia_api.CALLBACK_FALLBACK_DELAY)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), TRANSCRIPTION_TIMEOUT + gladia_api.POLL_INTERVAL)
+    except asyncio.TimeoutError:
+        print(f"Timeout waiting for transcription {job_id}.")
+        return None
+
+async def check_transcription_status_async(job_id, audio_duration=None, callback=False):
+    if callback:
+        return await _await_callback(job_id, audio_duration)
+
+    headers = {'x-gladia-key': gladia_api.API_KEY}
+    get_url = f"{TRANSCRIPTION_URL}/{job_id}"
+    deadline = time.monotonic() + TRANSCRIPTION_TIMEOUT
+    delay = initial_poll_delay(audio_duration)
+    polls = 0
+
+    while True:
+        # Same adaptive schedule as the threaded poller: short first wait, then back off
+        await asyncio.sleep(delay)
+        polls += 1
+        try:
+            async with get_session().get(get_url, headers=headers) as response:
+                response.raise_for_status()
+                result = await response.json()
+            status = result.get('status')
+
+            if status == "done":
+                print(f"Transcription {job_id} completed after {polls} polls.")
+                return result
+            elif status == "error" or result.get('error_code'):
+                error_message = result.get('error_code', 'Unknown error')
+                print(f"Transcription failed: {error_message}")
+                return None
+            else:  # queued or processing
+                print(f"Transcription {job_id} in progress (poll {polls}). Status: {status}.")
+        except Exception as e:
+            print(f"Error checking transcription: {str(e)}")
+
+        if time.monotonic() + delay > deadline:
+            print(f"Timeout after {polls} polls.")
+            return None
+        delay = next_poll_delay(delay)
+
+async def transcribe_audio_async(file_path, callback_url=None):
+    print(f"Starting transcription for: {file_path}")
+    callback_url = callback_url or gladia_api.CALLBACK_URL
+
+    audio_url = await upload_audio_async(file_path)
+    if not audio_url:
+        print("Failed to upload audio.")
+        return None, None
+
+    job_id = await request_transcription_async(audio_url, callback_url)
+    if not job_id:
+        print("Failed to request transcription.")
+        return None, None
+
+    audio_duration = await asyncio.to_thread(estimate_audio_duration, file_path)
+    transcription_result = await check_transcription_status_async(job_id, audio_duration,
+                                                                  callback=bool(callback_url))
+    if transcription_result:
+        try:
+            transcript, language_str = extract_transcription(transcription_result)
+            print(f"Transcription completed. Detected language(s): {language_str}")
+            return transcript, language_str
+        except Exception as e:
+            print(f"Error extracting transcription data: {str(e)}")
+            return None, None
+    else:
+        print("Failed to get transcription result.")
+        return None, None
+
+async def transcribe_many_async(paths, max_concurrency=gladia_api.BATCH_CONCURRENCY):
+    """Async counterpart of transcribe_many. Returns {path: (transcript, language)}."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(path):
+        async with semaphore:
+            return path, await transcribe_audio_async(path)
+
+    results = {}
+    for finished in asyncio.as_completed([run(path) for path in paths]):
+        path, result = await finished
+        results[path] = result
+    return results
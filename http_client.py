@@ -0,0 +1,159 @@
+import os
+import threading
+import logging
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Defaults applied to every upstream host unless overridden below
+DEFAULT_HOST_CONFIG: Dict[str, Any] = {
+    "pool_maxsize": int(os.getenv("HTTP_POOL_MAXSIZE", 10)),
+    "pool_block": False,
+    "timeout": (5, 30),  # (connect, read) seconds
+    "retries": 2,
+    "backoff_factor": 0.5,
+    "status_forcelist": (502, 503, 504),
+    "allowed_methods": ("GET", "HEAD"),  # never replay non-idempotent POSTs on read errors
+}
+
+# Per-upstream overrides
+HOST_CONFIGS: Dict[str, Dict[str, Any]] = {
+    # Uploads can be large and transcription GETs are safe to retry
+    "api.gladia.io": {"timeout": (5, 60), "retries": 3},
+    # eleven_labs_tts runs its own rate-limit aware retry loop
+    "api.elevenlabs.io": {"timeout": (5, 30), "retries": 0},
+}
+
+
+class HTTPClientPool:
+    """
+    Thread-safe registry of keep-alive requests sessions, one per upstream host.
+
+    Each session mounts an HTTPAdapter sized and configured for its host, so
+    repeated provider calls reuse TCP/TLS connections instead of opening a
+    fresh one per request.
+    """
+
+    def __init__(self, host_configs: Optional[Dict[str, Dict[str, Any]]] = None,
+                 default_config: Optional[Dict[str, Any]] = None):
+        self.default_config = dict(DEFAULT_HOST_CONFIG, **(default_config or {}))
+        self.host_configs = {host: dict(config) for host, config in (host_configs or HOST_CONFIGS).items()}
+        self._sessions: Dict[str, requests.Session] = {}
+        self._adapters: Dict[str, HTTPAdapter] = {}
+        self._lock = threading.Lock()
+
+    def configure_host(self, host: str, **overrides) -> None:
+        """Override pool settings for a host. Takes effect for sessions created afterwards."""
+        with self._lock:
+            self.host_configs.setdefault(host, {}).update(overrides)
+            session = self._sessions.pop(host, None)
+            self._adapters.pop(host, None)
+        if session is not None:
+            session.close()
+
+    def config_for(self, host: str) -> Dict[str, Any]:
+        return dict(self.default_config, **self.host_configs.get(host, {}))
+
+    def session_for(self, url: str) -> requests.Session:
+        """Return the pooled session for the URL's host, creating it on first use."""
+        host = urlsplit(url).hostname or ""
+        session = self._sessions.get(host)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                config = self.config_for(host)
+                retry = Retry(
+                    total=config["retries"],
+                    connect=config["retries"],
+                    read=config["retries"],
+                    status=config["retries"],
+                    backoff_factor=config["backoff_factor"],
+                    status_forcelist=config["status_forcelist"],
+                    allowed_methods=frozenset(config["allowed_methods"]),
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=config["pool_maxsize"],
+                    pool_block=config["pool_block"],
+                    max_retries=retry,
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+                self._adapters[host] = adapter
+                logger.info(f"Created pooled HTTP session for {host} (pool size {config['pool_maxsize']})")
+            return session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Issue a request through the host's pooled session, applying its default timeout."""
+        session = self.session_for(url)
+        if "timeout" not in kwargs:
+            kwargs["timeout"] = self.config_for(urlsplit(url).hostname or "")["timeout"]
+        return session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Per-host pool counters.
+
+        Returns:
+            Dict[str, Dict[str, int]]: requests sent, new connections opened (pool misses)
+            and requests served on a kept-alive connection (pool hits)
+        """
+        with self._lock:
+            adapters = list(self._adapters.items())
+
+        stats = {}
+        for host, adapter in adapters:
+            requests_sent = 0
+            new_connections = 0
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                requests_sent += pool.num_requests
+                new_connections += pool.num_connections
+            stats[host] = {
+                "requests": requests_sent,
+                "pool_misses": new_connections,
+                "pool_hits": max(requests_sent - new_connections, 0),
+            }
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            self._adapters.clear()
+        for session in sessions:
+            session.close()
+
+
+_http_pool: Optional[HTTPClientPool] = None
+_http_pool_lock = threading.Lock()
+
+
+def get_http_pool() -> HTTPClientPool:
+    """Return the process-wide HTTPClientPool shared by all provider clients."""
+    global _http_pool
+    with _http_pool_lock:
+        if _http_pool is None:
+            _http_pool = HTTPClientPool()
+        return _http_pool
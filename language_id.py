@@ -0,0 +1,52 @@
+import os
+import logging
+import threading
+from typing import Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Below this probability the local guess is not trusted and the remote detector is asked
+LANGID_CONFIDENCE_THRESHOLD = float(os.getenv("LANGID_CONFIDENCE_THRESHOLD", 0.8))
+
+# langid codes that googletrans spells differently
+_GOOGLETRANS_CODES = {"zh": "zh-cn", "jv": "jw"}
+
+
+class LocalLanguageIdentifier:
+    """
+    In-process language identification with langid.py's n-gram model.
+
+    langid is listed in requirements.txt; if it is missing anyway, the
+    identifier reports itself unavailable and callers fall back to remote
+    detection. The model is loaded once, on first use, and classifies a
+    sentence in well under a millisecond.
+    """
+
+    def __init__(self):
+        self._identifier = None
+        self._lock = threading.Lock()
+        try:
+            import langid  # noqa: F401
+            self._installed = True
+        except ImportError:
+            self._installed = False
+            logger.warning("langid not installed (see requirements.txt); language detection will use the remote service")
+
+    def available(self) -> bool:
+        return self._installed
+
+    def _get_identifier(self):
+        with self._lock:
+            if self._identifier is None:
+                from langid.langid import LanguageIdentifier, model
+                # Normalized probabilities, so the score can be compared against a threshold
+                self._identifier = LanguageIdentifier.from_modelstring(model, norm_probs=True)
+            return self._identifier
+
+    def identify(self, text: str) -> Optional[Tuple[str, float]]:
+        """Return (googletrans language code, probability), or None if unavailable"""
+        if not self._installed or not text or text.isspace():
+            return None
+        language, probability = self._get_identifier().classify(text)
+        return _GOOGLETRANS_CODES.get(language, language), float(probability)
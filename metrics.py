@@ -0,0 +1,52 @@
+import threading
+from collections import deque
+from typing import Any, Dict, Optional
+
+
+class LatencyStats:
+    """
+    Thread-safe latency recorder for one upstream or pipeline stage.
+
+    Keeps running totals plus a bounded window of recent samples for
+    percentiles, and an exponentially weighted moving average that reacts
+    quickly to a degrading upstream.
+    """
+
+    def __init__(self, window: int = 200, alpha: float = 0.2):
+        self.alpha = alpha
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.ewma: Optional[float] = None
+
+    def record(self, seconds: float, success: bool = True) -> None:
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            if not success:
+                self.errors += 1
+            self._samples.append(seconds)
+            self.ewma = seconds if self.ewma is None else self.alpha * seconds + (1 - self.alpha) * self.ewma
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the pct-th percentile (0-100) of recent samples, or None without data"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(int(round(pct / 100.0 * (len(samples) - 1))), len(samples) - 1)
+        return samples[index]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            count, errors, total, ewma = self.count, self.errors, self.total, self.ewma
+        return {
+            "count": count,
+            "errors": errors,
+            "mean": total / count if count else None,
+            "ewma": ewma,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+        }
@@ -0,0 +1,89 @@
+import os
+import re
+import logging
+import threading
+from typing import Any, Dict, List, Tuple
+
+from metrics import LatencyStats
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+FAST_MODEL = os.getenv("FAST_MODEL", "gemini-1.5-flash")
+LARGE_MODEL = os.getenv("LARGE_MODEL", "gemini-1.5-pro")
+MODEL_ROUTING_ENABLED = os.getenv("MODEL_ROUTING_ENABLED", "true").lower() == "true"
+LONG_PROMPT_WORDS = int(os.getenv("ROUTER_LONG_PROMPT_WORDS", 25))  # longer prompts go to the large model
+DEEP_CONVERSATION_TURNS = int(os.getenv("ROUTER_DEEP_CONVERSATION_TURNS", 6))  # user turns before staying large
+
+# Small talk the fast model handles as well as the large one
+SIMPLE_INTENT = re.compile(
+    r"^\s*(hi|hello|hey|thanks|thank you|good (morning|afternoon|evening|night)|bye|goodbye|"
+    r"how are you|what'?s up|ok(ay)?|yes|no|sure|cool|nice|great)\b",
+    re.IGNORECASE
+)
+# Requests that benefit from the large model's reasoning
+COMPLEX_INTENT = re.compile(
+    r"\b(explain|why|how (does|do|can|would|should)|compare|difference|analy[sz]e|step[- ]by[- ]step|"
+    r"plan|design|write|code|debug|summari[sz]e|pros and cons|calculate|solve|prove|recommend)\b",
+    re.IGNORECASE
+)
+
+
+class ModelRouter:
+    """
+    Chooses between a fast and a large model for each turn.
+
+    - Short small talk goes to the fast model.
+    - Prompts with a reasoning-heavy intent, long prompts, and conversations
+      past DEEP_CONVERSATION_TURNS user turns go to the large model.
+    - Everything else (short, plain questions) goes to the fast model.
+    Latency is recorded per model so the thresholds can be tuned.
+    """
+
+    def __init__(self, fast_model: str = FAST_MODEL, large_model: str = LARGE_MODEL,
+                 long_prompt_words: int = LONG_PROMPT_WORDS, deep_turns: int = DEEP_CONVERSATION_TURNS):
+        self.fast_model = fast_model
+        self.large_model = large_model
+        self.long_prompt_words = long_prompt_words
+        self.deep_turns = deep_turns
+        self.latency: Dict[str, LatencyStats] = {fast_model: LatencyStats(), large_model: LatencyStats()}
+        self.routed: Dict[str, int] = {"small_talk": 0, "complex_intent": 0, "long_prompt": 0,
+                                       "deep_conversation": 0, "short_question": 0}
+        self._lock = threading.Lock()
+
+    def classify(self, messages: List[Dict[str, str]]) -> Tuple[str, str]:
+        """Return (model name, reason) for the newest user turn"""
+        prompt = next((msg["content"] for msg in reversed(messages) if msg["role"] == "user"), "")
+        words = len(prompt.split())
+        user_turns = sum(1 for msg in messages if msg["role"] == "user")
+
+        if SIMPLE_INTENT.match(prompt) and words <= 12 and not COMPLEX_INTENT.search(prompt):
+            return self.fast_model, "small_talk"
+        if COMPLEX_INTENT.search(prompt):
+            return self.large_model, "complex_intent"
+        if words > self.long_prompt_words:
+            return self.large_model, "long_prompt"
+        if user_turns > self.deep_turns:
+            return self.large_model, "deep_conversation"
+        return self.fast_model, "short_question"
+
+    def choose(self, messages: List[Dict[str, str]]) -> str:
+        model, reason = self.classify(messages)
+        with self._lock:
+            self.routed[reason] += 1
+        logger.info(f"Routing to {model} ({reason})")
+        return model
+
+    def record(self, model: str, seconds: float, success: bool = True) -> None:
+        stats = self.latency.get(model)
+        if stats is not None:
+            stats.record(seconds, success)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            routed = dict(self.routed)
+        return {
+            "routes": routed,
+            "models": {"fast": self.fast_model, "large": self.large_model},
+            "latency": {name: stats.snapshot() for name, stats in self.latency.items()},
+        }
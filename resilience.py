@@ -0,0 +1,218 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Optional
+
+from metrics import LatencyStats
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+HEDGE_MIN_DELAY = 0.05  # never hedge sooner than this (seconds)
+HEDGE_DEFAULT_DELAY = 1.0  # used until enough latency samples exist
+HEDGE_MIN_SAMPLES = 20
+HEDGE_BUDGET_RATIO = 0.1  # at most this share of calls may be hedged
+CALL_TIMEOUT = 10.0  # overall deadline for one call, hedge included (seconds)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Per-upstream circuit breaker.
+
+    closed: calls go through; `failure_threshold` consecutive failures open it.
+    open: calls are rejected immediately for `reset_timeout` seconds.
+    half_open: one trial call is let through; success closes the breaker,
+    failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self._stats = {"rejected": 0, "times_opened": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        # Caller holds self._lock
+        if self._state == self.OPEN and now - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        """Return True if a call may be made now"""
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit '{self.name}' closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._stats["times_opened"] += 1
+                    logger.warning(f"Circuit '{self.name}' opened after {self._failures} failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["state"] = self._current_state(time.monotonic())
+            stats["consecutive_failures"] = self._failures
+        return stats
+
+
+class ResilientCaller:
+    """
+    Calls one upstream through a circuit breaker, optionally hedged.
+
+    With hedging on (it is opt-in), a second identical attempt is started if
+    the first has been running for longer than the upstream's recent p95
+    latency; whichever succeeds first wins. The delay counts from when the
+    first attempt starts, not from when it is queued, so a busy executor
+    does not trigger hedges, and at most hedge_budget of all calls are
+    hedged, so a slow upstream never sees close to double the traffic.
+    Latency is recorded per attempt, so hedging does not skew the p95 it is
+    based on. Every call is bounded by `timeout`.
+    """
+
+    def __init__(self, name: str, breaker: Optional[CircuitBreaker] = None, hedge: bool = False,
+                 max_workers: int = 8, timeout: float = CALL_TIMEOUT, hedge_budget: float = HEDGE_BUDGET_RATIO):
+        self.name = name
+        self.breaker = breaker or CircuitBreaker(name)
+        self.hedge = hedge
+        self.timeout = timeout
+        self.hedge_budget = hedge_budget
+        self.latency = LatencyStats()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-call")
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "hedged": 0, "hedge_wins": 0, "primary_wins": 0, "hedges_over_budget": 0,
+                       "timeouts": 0}
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def _take_hedge(self) -> bool:
+        """Count a hedge if the budget allows one"""
+        with self._lock:
+            if self._stats["hedged"] + 1 > self._stats["calls"] * self.hedge_budget:
+                self._stats["hedges_over_budget"] += 1
+                return False
+            self._stats["hedged"] += 1
+            return True
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait before hedging: the recent p95 attempt latency"""
+        if self.latency.count < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        return max(self.latency.percentile(95) or HEDGE_DEFAULT_DELAY, HEDGE_MIN_DELAY)
+
+    def _attempt(self, fn: Callable[..., Any], args, kwargs, started: Optional[threading.Event] = None) -> Any:
+        if started is not None:
+            started.set()
+        start = time.perf_counter()
+        success = False
+        try:
+            result = fn(*args, **kwargs)
+            success = True
+            return result
+        finally:
+            self.latency.record(time.perf_counter() - start, success)
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) against the upstream.
+
+        Raises:
+            CircuitOpenError: If the breaker is open (no call is made)
+            TimeoutError: If no attempt succeeded within self.timeout
+            Exception: Whatever the attempt(s) raised, if none succeeded
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Circuit '{self.name}' is open")
+        self._count("calls")
+        deadline = time.monotonic() + self.timeout
+
+        started = threading.Event()
+        primary = self._executor.submit(self._attempt, fn, args, kwargs, started)
+        futures = [primary]
+        if self.hedge:
+            # Queueing time in the executor is not upstream latency; start the hedge clock once the attempt runs
+            if started.wait(max(deadline - time.monotonic(), 0)):
+                done, _ = wait(futures, timeout=min(self.hedge_delay(), max(deadline - time.monotonic(), 0)))
+                if not done and time.monotonic() < deadline and self._take_hedge():
+                    futures.append(self._executor.submit(self._attempt, fn, args, kwargs))
+
+        try:
+            result, winner = self._first_success(futures, deadline)
+        except Exception as e:
+            if isinstance(e, TimeoutError):
+                self._count("timeouts")
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        if len(futures) > 1:
+            self._count("primary_wins" if winner is primary else "hedge_wins")
+        return result
+
+    def _first_success(self, futures, deadline: float):
+        """Return (result, future) of the first attempt to succeed, or raise the last error"""
+        pending = set(futures)
+        error: Optional[BaseException] = None
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                for future in pending:
+                    future.cancel()
+                raise TimeoutError(f"'{self.name}' did not answer within {self.timeout}s")
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result(), future
+                error = future.exception()
+        raise error
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        hedged = stats["hedged"]
+        stats["hedge_win_rate"] = stats["hedge_wins"] / hedged if hedged else None
+        stats["hedge_delay"] = self.hedge_delay()
+        stats["breaker"] = self.breaker.stats()
+        stats["latency"] = self.latency.snapshot()
+        return stats
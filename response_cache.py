@@ -0,0 +1,144 @@
+import os
+import re
+import math
+import time
+import logging
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from typing import Any, Dict, Optional, Set
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"  # opt-in: replies are shared across users
+RESPONSE_CACHE_THRESHOLD = float(os.getenv("RESPONSE_CACHE_THRESHOLD", 0.9))  # cosine similarity for a near-duplicate hit
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", 6 * 3600))
+RESPONSE_CACHE_MAX_ENTRIES = 2000  # per scope
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+
+def embed_query(normalized: str) -> Dict[str, float]:
+    """
+    Sparse, L2-normalized bag of word unigrams and character trigrams.
+
+    Cheap to compute on the CPU and robust to small wording and spelling
+    differences ("hi, what can you do" vs "hey what can u do").
+    """
+    features = Counter(normalized.split())
+    padded = f" {normalized} "
+    features.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    norm = math.sqrt(sum(count * count for count in features.values()))
+    if not norm:
+        return {}
+    return {feature: count / norm for feature, count in features.items()}
+
+
+class _ScopeIndex:
+    """Entries of one scope plus an inverted index from feature to entry keys"""
+
+    def __init__(self):
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.postings: Dict[str, Set[str]] = defaultdict(set)
+
+    def add(self, key: str, vector: Dict[str, float], response: str) -> None:
+        self.remove(key)
+        self.entries[key] = {"vector": vector, "response": response, "created_at": time.time()}
+        for feature in vector:
+            self.postings[feature].add(key)
+
+    def remove(self, key: str) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for feature in entry["vector"]:
+            keys = self.postings.get(feature)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.postings[feature]
+
+    def nearest(self, vector: Dict[str, float]):
+        """Return (key, cosine similarity) of the closest entry, or (None, 0.0)"""
+        scores: Dict[str, float] = defaultdict(float)
+        for feature, weight in vector.items():
+            for key in self.postings.get(feature, ()):
+                scores[key] += weight * self.entries[key]["vector"][feature]
+        if not scores:
+            return None, 0.0
+        key = max(scores, key=scores.get)
+        return key, scores[key]
+
+
+class SemanticResponseCache:
+    """
+    Cache of model replies to stateless queries, looked up by meaning.
+
+    Queries are normalized and matched exactly first; otherwise the nearest
+    cached query (cosine similarity over unigram/trigram vectors, found via an
+    inverted index) is a hit if it scores at least `threshold`. Entries are
+    partitioned by scope (e.g. the character profile), expire after `ttl`
+    seconds and are evicted oldest-first beyond `max_entries` per scope.
+    """
+
+    def __init__(self, threshold: float = RESPONSE_CACHE_THRESHOLD, ttl: float = RESPONSE_CACHE_TTL,
+                 max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._scopes: Dict[str, _ScopeIndex] = {}
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "exact_hits": 0, "semantic_hits": 0, "misses": 0}
+
+    def _evict_expired(self, index: _ScopeIndex, now: float) -> None:
+        # Caller holds self._lock; entries are in insertion order, so expired ones lead
+        while index.entries:
+            key, entry = next(iter(index.entries.items()))
+            if now - entry["created_at"] <= self.ttl:
+                break
+            index.remove(key)
+
+    def get(self, scope: str, query: str) -> Optional[str]:
+        """Return the cached reply for query (or a near-duplicate of it), else None"""
+        normalized = normalize_query(query)
+        with self._lock:
+            self._stats["lookups"] += 1
+            index = self._scopes.get(scope)
+            if index is not None and normalized:
+                self._evict_expired(index, time.time())
+                entry = index.entries.get(normalized)
+                if entry is not None:
+                    self._stats["exact_hits"] += 1
+                    return entry["response"]
+
+                key, similarity = index.nearest(embed_query(normalized))
+                if key is not None and similarity >= self.threshold:
+                    self._stats["semantic_hits"] += 1
+                    logger.info(f"Semantic cache hit ({similarity:.2f}): '{normalized}' ~ '{key}'")
+                    return index.entries[key]["response"]
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, scope: str, query: str, response: str) -> None:
+        normalized = normalize_query(query)
+        if not normalized or not response:
+            return
+        vector = embed_query(normalized)
+        with self._lock:
+            index = self._scopes.setdefault(scope, _ScopeIndex())
+            index.add(normalized, vector, response)
+            while len(index.entries) > self.max_entries:
+                index.remove(next(iter(index.entries)))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["entries"] = sum(len(index.entries) for index in self._scopes.values())
+        hits = stats["exact_hits"] + stats["semantic_hits"]
+        stats["hit_rate"] = hits / stats["lookups"] if stats["lookups"] else None
+        return stats
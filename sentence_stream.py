@@ -0,0 +1,35 @@
+import re
+from typing import Iterable, Iterator
+
+# End of a sentence: terminal punctuation (plus closing quotes/brackets) followed by
+# whitespace, CJK/Devanagari full stops (no space needed), or a line break.
+SENTENCE_BOUNDARY = re.compile(r'[.!?…]+["\'”’)\]]*\s+|[。！？।]+|\n+')
+
+# Shorter fragments ("Sure!", "Dr.") are merged into the following sentence
+MIN_SENTENCE_CHARS = 12
+
+
+def iter_sentences(chunks: Iterable[str], min_chars: int = MIN_SENTENCE_CHARS) -> Iterator[str]:
+    """
+    Re-chunk streamed text into complete sentences.
+
+    Each sentence is yielded as soon as its boundary has been seen, so
+    downstream stages (translation, TTS) can start before the stream ends.
+    Whatever is left when the stream finishes is yielded as the last sentence.
+    """
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        start = 0
+        for match in SENTENCE_BOUNDARY.finditer(buffer):
+            if match.end() - start < min_chars:
+                continue
+            sentence = buffer[start:match.end()].strip()
+            if sentence:
+                yield sentence
+            start = match.end()
+        buffer = buffer[start:]
+
+    tail = buffer.strip()
+    if tail:
+        yield tail
@@ -0,0 +1,205 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Optional, Tuple, Any
+
+from gladia_api import transcribe_audio, estimate_audio_duration
+from metrics import LatencyStats
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+SHORT_CLIP_SECONDS = float(os.getenv("LOCAL_STT_SHORT_CLIP_SECONDS", 4))  # clips this short go local
+REMOTE_LATENCY_BUDGET = float(os.getenv("REMOTE_STT_LATENCY_BUDGET", 15))  # seconds before falling back
+REMOTE_MAX_IN_FLIGHT = int(os.getenv("REMOTE_STT_MAX_IN_FLIGHT", 8))  # remote calls running, abandoned ones included
+REMOTE_PROBE_EVERY = 10  # while over budget, still send every Nth request remote to refresh its latency
+LOCAL_STT_MODEL = os.getenv("LOCAL_STT_MODEL", "tiny")
+LOCAL_STT_THREADS = int(os.getenv("LOCAL_STT_THREADS", 2))
+
+Transcription = Tuple[Optional[str], Optional[str]]
+
+
+class SpeechBackend:
+    """Interface for speech-to-text engines: transcribe a file to (text, language)"""
+
+    name = "base"
+
+    def available(self) -> bool:
+        return True
+
+    def transcribe(self, audio_path: str) -> Transcription:
+        raise NotImplementedError
+
+
+class GladiaBackend(SpeechBackend):
+    """Remote transcription through the Gladia API"""
+
+    name = "gladia"
+
+    def transcribe(self, audio_path: str) -> Transcription:
+        return transcribe_audio(audio_path)
+
+
+class LocalWhisperBackend(SpeechBackend):
+    """
+    In-process CPU transcription with a small faster-whisper model.
+
+    The model is loaded on a background thread when the backend is created,
+    so startup is not blocked and no request waits on the load. Until it is
+    ready (or if faster-whisper is missing or fails to load) the backend
+    reports itself unavailable and the router sends everything remote.
+    """
+
+    name = "local"
+
+    def __init__(self, model_size: str = LOCAL_STT_MODEL, cpu_threads: int = LOCAL_STT_THREADS):
+        self.model_size = model_size
+        self.cpu_threads = cpu_threads
+        self._model = None
+        try:
+            import faster_whisper  # noqa: F401
+        except ImportError:
+            logger.warning("faster-whisper not installed; local speech backend disabled")
+            return
+        threading.Thread(target=self._load_model, name="whisper-load", daemon=True).start()
+
+    def _load_model(self) -> None:
+        try:
+            from faster_whisper import WhisperModel
+            logger.info(f"Loading local Whisper model '{self.model_size}'")
+            self._model = WhisperModel(self.model_size, device="cpu", compute_type="int8",
+                                       cpu_threads=self.cpu_threads)
+            logger.info(f"Local Whisper model '{self.model_size}' ready")
+        except Exception as e:
+            logger.error(f"Failed to load local Whisper model '{self.model_size}': {e}")
+
+    def available(self) -> bool:
+        return self._model is not None
+
+    def transcribe(self, audio_path: str) -> Transcription:
+        model = self._model
+        if model is None:
+            raise RuntimeError("Local Whisper model is not loaded")
+        segments, info = model.transcribe(audio_path, beam_size=1, vad_filter=True)
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        return (text or None), (info.language if text else None)
+
+
+class SpeechRouter:
+    """
+    Chooses a speech backend per request.
+
+    - Clips shorter than short_clip_seconds are transcribed locally.
+    - Longer clips go to the remote backend, unless its recent latency
+      already exceeds the budget, in which case they go local (every
+      REMOTE_PROBE_EVERY-th request still probes the remote).
+    - A remote call that fails, or is still running when the budget runs
+      out, falls back to local. Abandoned calls keep running until Gladia
+      answers, so they count against max_remote_in_flight; once that many
+      are running, requests go straight to the local backend instead of
+      queueing behind them.
+    Latency is recorded per backend so the thresholds can be tuned.
+    """
+
+    def __init__(self, remote: Optional[SpeechBackend] = None, local: Optional[SpeechBackend] = None,
+                 short_clip_seconds: float = SHORT_CLIP_SECONDS, remote_budget: float = REMOTE_LATENCY_BUDGET,
+                 max_remote_in_flight: int = REMOTE_MAX_IN_FLIGHT):
+        self.remote = remote or GladiaBackend()
+        self.local = local or LocalWhisperBackend()
+        self.short_clip_seconds = short_clip_seconds
+        self.remote_budget = remote_budget
+        self.latency: Dict[str, LatencyStats] = {self.remote.name: LatencyStats(), self.local.name: LatencyStats()}
+        self.routed: Dict[str, int] = {"short_clip": 0, "remote": 0, "remote_over_budget": 0, "remote_timeout": 0,
+                                       "remote_saturated": 0, "remote_error": 0}
+        self._routed_lock = threading.Lock()
+        self._over_budget_checks = 0
+        self.max_remote_in_flight = max_remote_in_flight
+        self._remote_in_flight = 0
+        # One thread per allowed call, so a submitted remote call never waits in the executor's queue
+        self._executor = ThreadPoolExecutor(max_workers=max_remote_in_flight, thread_name_prefix="stt-remote")
+
+    def _run(self, backend: SpeechBackend, audio_path: str) -> Transcription:
+        start = time.perf_counter()
+        success = False
+        try:
+            result = backend.transcribe(audio_path)
+            success = bool(result[0])
+            return result
+        finally:
+            self.latency[backend.name].record(time.perf_counter() - start, success)
+
+    def _count(self, route: str) -> None:
+        with self._routed_lock:
+            self.routed[route] += 1
+
+    def _probe_due(self) -> bool:
+        with self._routed_lock:
+            self._over_budget_checks += 1
+            return self._over_budget_checks % REMOTE_PROBE_EVERY == 0
+
+    def _acquire_remote_slot(self) -> bool:
+        with self._routed_lock:
+            if self._remote_in_flight >= self.max_remote_in_flight:
+                return False
+            self._remote_in_flight += 1
+            return True
+
+    def _release_remote_slot(self, _future=None) -> None:
+        with self._routed_lock:
+            self._remote_in_flight -= 1
+
+    def transcribe(self, audio_path: str) -> Transcription:
+        if not self.local.available():
+            self._count("remote")
+            return self._run(self.remote, audio_path)
+
+        duration = estimate_audio_duration(audio_path)
+        if duration is not None and duration <= self.short_clip_seconds:
+            self._count("short_clip")
+            transcript, language = self._run(self.local, audio_path)
+            if transcript:
+                return transcript, language
+            return self._run(self.remote, audio_path)
+
+        recent_remote = self.latency[self.remote.name].ewma
+        if recent_remote is not None and recent_remote > self.remote_budget and not self._probe_due():
+            self._count("remote_over_budget")
+            logger.info(f"Remote STT latency {recent_remote:.1f}s over budget; transcribing locally")
+            return self._run(self.local, audio_path)
+
+        if not self._acquire_remote_slot():
+            self._count("remote_saturated")
+            logger.warning(f"{self.max_remote_in_flight} remote STT calls still running; transcribing locally")
+            return self._run(self.local, audio_path)
+
+        self._count("remote")
+        try:
+            future = self._executor.submit(self._run, self.remote, audio_path)
+        except Exception:
+            self._release_remote_slot()
+            raise
+        future.add_done_callback(self._release_remote_slot)
+        try:
+            transcript, language = future.result(timeout=self.remote_budget)
+            if transcript:
+                return transcript, language
+        except FutureTimeoutError:
+            self._count("remote_timeout")
+            logger.warning(f"Remote STT exceeded {self.remote_budget}s budget; falling back to local")
+        except Exception as e:
+            self._count("remote_error")
+            logger.warning(f"Remote STT failed ({e}); falling back to local")
+        return self._run(self.local, audio_path)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._routed_lock:
+            routes = dict(self.routed)
+            remote_in_flight = self._remote_in_flight
+        return {
+            "routes": routes,
+            "remote_in_flight": remote_in_flight,
+            "local_available": self.local.available(),
+            "latency": {name: stats.snapshot() for name, stats in self.latency.items()},
+        }
@@ -0,0 +1,183 @@
+import os
+import json
+import queue
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+import gladia_api
+from http_client import get_http_pool
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+LIVE_URL = 'https://api.gladia.io/v2/live'
+STREAM_SAMPLE_RATE = 16000  # the browser sends 16-bit mono PCM at this rate
+STREAMING_BACKEND = os.getenv("STREAMING_STT_BACKEND", "gladia")
+
+
+class TranscriptEvent:
+    """A partial or final transcript produced by a streaming backend"""
+
+    __slots__ = ("text", "is_final", "language")
+
+    def __init__(self, text: str, is_final: bool, language: Optional[str] = None):
+        self.text = text
+        self.is_final = is_final
+        self.language = language
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"type": "final" if self.is_final else "partial", "text": self.text, "language": self.language}
+
+
+class StreamingSTTBackend:
+    """
+    Interface for real-time speech-to-text engines.
+
+    Audio is pushed with send_audio(); transcripts are delivered to the
+    on_transcript callback from the backend's own thread.
+    """
+
+    def start(self, on_transcript: Callable[[TranscriptEvent], None],
+              sample_rate: int = STREAM_SAMPLE_RATE, language: Optional[str] = None) -> None:
+        raise NotImplementedError
+
+    def send_audio(self, chunk: bytes) -> None:
+        raise NotImplementedError
+
+    def finish(self, timeout: float = 10) -> None:
+        """Signal end of audio and wait (up to timeout) for the last transcripts"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+
+class GladiaLiveBackend(StreamingSTTBackend):
+    """Relays audio to a Gladia v2 live transcription session over its WebSocket"""
+
+    def __init__(self):
+        self._ws = None
+        self._reader: Optional[threading.Thread] = None
+        self._send_lock = threading.Lock()
+        self._on_transcript: Optional[Callable[[TranscriptEvent], None]] = None
+
+    def start(self, on_transcript: Callable[[TranscriptEvent], None],
+              sample_rate: int = STREAM_SAMPLE_RATE, language: Optional[str] = None) -> None:
+        import websocket  # websocket-client, only needed for live mode
+
+        config = {
+            "encoding": "wav/pcm",
+            "bit_depth": 16,
+            "sample_rate": sample_rate,
+            "channels": 1,
+            "messages_config": {"receive_partial_transcripts": True},
+        }
+        if language:
+            config["language_config"] = {"languages": [language], "code_switching": False}
+
+        response = get_http_pool().post(LIVE_URL, headers={'x-gladia-key': gladia_api.API_KEY}, json=config)
+        response.raise_for_status()
+        session = response.json()
+        logger.info(f"Gladia live session started: {session.get('id')}")
+
+        self._on_transcript = on_transcript
+        self._ws = websocket.create_connection(session["url"], timeout=30)
+        self._reader = threading.Thread(target=self._read_loop, name="gladia-live-reader", daemon=True)
+        self._reader.start()
+
+    def _read_loop(self) -> None:
+        while True:
+            try:
+                raw = self._ws.recv()
+            except Exception:
+                break
+            if not raw:
+                break
+            try:
+                message = json.loads(raw)
+            except ValueError:
+                continue
+            if message.get("type") != "transcript":
+                continue
+            data = message.get("data", {})
+            utterance = data.get("utterance", {})
+            text = (utterance.get("text") or "").strip()
+            if text and self._on_transcript:
+                self._on_transcript(TranscriptEvent(text, bool(data.get("is_final")), utterance.get("language")))
+
+    def send_audio(self, chunk: bytes) -> None:
+        import websocket
+
+        with self._send_lock:
+            self._ws.send(chunk, opcode=websocket.ABNF.OPCODE_BINARY)
+
+    def finish(self, timeout: float = 10) -> None:
+        with self._send_lock:
+            self._ws.send(json.dumps({"type": "stop_recording"}))
+        # Gladia flushes the last final transcripts, then closes the socket
+        self._reader.join(timeout)
+
+    def close(self) -> None:
+        if self._ws is not None:
+            try:
+                self._ws.close()
+            except Exception:
+                pass
+
+
+STREAMING_BACKENDS: Dict[str, Callable[[], StreamingSTTBackend]] = {
+    "gladia": GladiaLiveBackend,
+}
+
+
+def register_streaming_backend(name: str, factory: Callable[[], StreamingSTTBackend]) -> None:
+    """Make a backend selectable by name, e.g. a local fake for development"""
+    STREAMING_BACKENDS[name] = factory
+
+
+def create_streaming_backend(name: Optional[str] = None) -> StreamingSTTBackend:
+    name = name or STREAMING_BACKEND
+    if name not in STREAMING_BACKENDS:
+        raise ValueError(f"Unknown streaming STT backend: {name}")
+    return STREAMING_BACKENDS[name]()
+
+
+class LiveTranscriptionSession:
+    """
+    Couples one client connection to one streaming backend.
+
+    Partial transcripts are forwarded as they arrive; final transcripts are
+    queued so the caller can start the assistant as soon as one lands.
+    """
+
+    def __init__(self, send_event: Callable[[Dict[str, object]], None], backend: Optional[StreamingSTTBackend] = None):
+        self.send_event = send_event
+        self.backend = backend or create_streaming_backend()
+        self.finals: "queue.Queue[TranscriptEvent]" = queue.Queue()
+
+    def _on_transcript(self, event: TranscriptEvent) -> None:
+        try:
+            self.send_event(event.to_dict())
+        except Exception as e:
+            logger.warning(f"Failed to forward transcript to client: {e}")
+        if event.is_final:
+            self.finals.put(event)
+
+    def start(self, sample_rate: int = STREAM_SAMPLE_RATE, language: Optional[str] = None) -> None:
+        self.backend.start(self._on_transcript, sample_rate=sample_rate, language=language)
+
+    def send_audio(self, chunk: bytes) -> None:
+        self.backend.send_audio(chunk)
+
+    def next_final(self, timeout: float = 0) -> Optional[TranscriptEvent]:
+        try:
+            return self.finals.get(timeout=timeout) if timeout else self.finals.get_nowait()
+        except queue.Empty:
+            return None
+
+    def finish(self) -> None:
+        self.backend.finish()
+
+    def close(self) -> None:
+        self.backend.close()
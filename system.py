@@ -1,7 +1,9 @@
 import os
 import logging
-from typing import Dict, Any, Optional, List
-from assistant import VoiceAssistant
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, Optional, List
+from assistant import VoiceAssistant, PIPELINE_TRANSLATE
 from tts import AIVoiceSystem
 import time
 import threading
@@ -42,6 +44,9 @@ class IntegratedVoiceSystem:
         self.task_queue = queue.Queue()
         self._start_worker_thread()
         
+        # Translates and synthesizes streamed sentences while the model keeps generating
+        self.segment_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tts-segment")
+        
         logger.info("Integrated Voice System initialized successfully")
     
     def _start_cleanup_task(self):
@@ -81,7 +86,8 @@ class IntegratedVoiceSystem:
         thread = threading.Thread(target=worker, daemon=True)
         thread.start()
     
-    def process_audio_sync(self, audio_path: str, target_language: str, character: str) -> Dict[str, Any]:
+    def process_audio_sync(self, audio_path: str, target_language: str, character: str,
+                           session_key: Optional[str] = None, pipeline: Optional[str] = None) -> Dict[str, Any]:
         """
         Process audio synchronously and return the result.
         
@@ -89,13 +95,15 @@ class IntegratedVoiceSystem:
             audio_path (str): Path to the audio file
             target_language (str): Target language for the response
             character (str): Character to use for TTS
+            session_key (Optional[str]): Per-user conversation key; turns with the same key share history
+            pipeline (Optional[str]): "translate" or "direct" (model answers in the target language); None for the default
             
         Returns:
             Dict[str, Any]: Result of the operation
         """
         try:
             # Process the audio file using the voice assistant
-            response_text = self.voice_assistant.run_session(audio_path, target_language)
+            response_text = self.voice_assistant.run_session(audio_path, target_language, session_key, pipeline)
             
             # Generate speech from the response
             timestamp = int(time.time())
@@ -124,6 +132,172 @@ class IntegratedVoiceSystem:
                 "error": str(e)
             }
     
+    def _translate_stream(self, sentences: Iterator[str], target_language: str) -> Iterator[str]:
+        """
+        Translate a stream of English sentences in order.
+        
+        The model stream is consumed on a separate thread; every sentence that
+        arrived while the previous translation was in flight goes into the next
+        batch, so a burst of sentences costs one translation call.
+        """
+        done = object()
+        ready: "queue.Queue" = queue.Queue()
+        
+        def produce():
+            try:
+                for sentence in sentences:
+                    ready.put(sentence)
+            except Exception as e:
+                ready.put(e)
+            ready.put(done)
+        
+        threading.Thread(target=produce, daemon=True).start()
+        
+        translation_handler = self.voice_assistant.translation_handler
+        finished = False
+        while not finished:
+            batch = [ready.get()]
+            while True:
+                try:
+                    batch.append(ready.get_nowait())
+                except queue.Empty:
+                    break
+            
+            error = next((item for item in batch if isinstance(item, Exception)), None)
+            finished = error is not None or batch[-1] is done
+            texts = [item for item in batch if isinstance(item, str)]
+            if texts:
+                yield from translation_handler.translate_batch(texts, target_language)
+            if error is not None:
+                raise error
+    
+    def _synthesize_segment(self, text: str, index: int, target_language: str,
+                            character: str, timestamp: int) -> Dict[str, Any]:
+        """Convert one translated sentence to speech"""
+        filename = f"{character}_{target_language}_{timestamp}_{index}.mp3"
+        result = self.tts_system.generate_speech(text, character, target_language, filename)
+        segment = {"type": "segment", "index": index, "text": text}
+        if result["success"]:
+            segment["audio_file"] = f"/audio/{result['filename']}"
+        else:
+            logger.error(f"TTS generation failed for segment {index}: {result.get('error')}")
+            segment["error"] = result.get('error', "TTS generation failed")
+        return segment
+    
+    def process_audio_stream(self, audio_path: str, target_language: str, character: str,
+                             session_key: Optional[str] = None,
+                             pipeline: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Process audio and stream the spoken reply sentence by sentence.
+        
+        Each sentence is translated and synthesized as soon as the model has
+        finished it, so the first audio is ready after roughly one sentence
+        instead of after the whole reply.
+        
+        Args:
+            audio_path (str): Path to the audio file
+            target_language (str): Target language for the response
+            character (str): Character to use for TTS
+            session_key (Optional[str]): Per-user conversation key; turns with the same key share history
+            pipeline (Optional[str]): "translate" or "direct" (model answers in the target language); None for the default
+            
+        Yields:
+            Dict[str, Any]: "transcript", then one "segment" per sentence (in order), then "done" or "error"
+        """
+        try:
+            transcript, detected_language = self.voice_assistant.recognize(audio_path)
+            if not transcript or transcript == "Could not understand audio":
+                yield {"type": "error", "error": "Sorry, I couldn't understand the audio. Please try again."}
+                return
+            yield {"type": "transcript", "text": transcript}
+            
+            timestamp = int(time.time())
+            pipeline = self.voice_assistant.resolve_pipeline(pipeline)
+            first_segment_latency = self.voice_assistant.pipeline_latency[f"{pipeline}_stream_first_segment"]
+            reply_started = time.perf_counter()
+            pending = deque()
+            texts = []
+            sentences = self.voice_assistant.respond_stream(
+                transcript, detected_language, session_key, target_language, pipeline
+            )
+            if pipeline == PIPELINE_TRANSLATE:
+                sentences = self._translate_stream(sentences, target_language)
+            for index, sentence in enumerate(sentences):
+                pending.append(self.segment_executor.submit(
+                    self._synthesize_segment, sentence, index, target_language, character, timestamp
+                ))
+                # Hand over finished segments without waiting for the rest of the reply
+                while pending and pending[0].done():
+                    segment = pending.popleft().result()
+                    if not texts:
+                        first_segment_latency.record(time.perf_counter() - reply_started)
+                    texts.append(segment["text"])
+                    yield segment
+            
+            while pending:
+                segment = pending.popleft().result()
+                if not texts:
+                    first_segment_latency.record(time.perf_counter() - reply_started)
+                texts.append(segment["text"])
+                yield segment
+            
+            yield {
+                "type": "done",
+                "success": True,
+                "transcribed_text": transcript,
+                "response_text": " ".join(texts)
+            }
+        except Exception as e:
+            logger.error(f"Error streaming audio response: {str(e)}", exc_info=True)
+            yield {"type": "error", "error": str(e)}
+    
+    def process_transcript_sync(self, transcript: str, detected_language: Optional[str],
+                                target_language: str, character: str,
+                                session_key: Optional[str] = None, pipeline: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Generate a spoken reply to an already-transcribed utterance (live mode).
+        
+        Args:
+            transcript (str): Final transcript from the streaming STT backend
+            detected_language (Optional[str]): Language reported by the backend, if any
+            target_language (str): Target language for the response
+            character (str): Character to use for TTS
+            session_key (Optional[str]): Per-user conversation key; turns with the same key share history
+            pipeline (Optional[str]): "translate" or "direct" (model answers in the target language); None for the default
+            
+        Returns:
+            Dict[str, Any]: Result of the operation
+        """
+        try:
+            response_text = self.voice_assistant.respond_to_transcript(
+                transcript, detected_language, target_language, session_key, pipeline
+            )
+            
+            timestamp = int(time.time())
+            filename = f"{character}_{target_language}_{timestamp}.mp3"
+            result = self.tts_system.generate_speech(response_text, character, target_language, filename)
+            
+            if result["success"]:
+                return {
+                    "success": True,
+                    "message": "Transcript processed successfully",
+                    "transcribed_text": transcript,
+                    "response_text": response_text,
+                    "audio_file": f"/audio/{result['filename']}"
+                }
+            else:
+                logger.error(f"TTS generation failed: {result.get('error')}")
+                return {
+                    "success": False,
+                    "error": result.get('error', "TTS generation failed")
+                }
+        except Exception as e:
+            logger.error(f"Error processing transcript: {str(e)}", exc_info=True)
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
     def process_audio_async(self, audio_path: str, target_language: str, character: str) -> str:
         """
         Process audio asynchronously and return a task ID.
@@ -149,7 +323,8 @@ class IntegratedVoiceSystem:
         
         return task_id
     
-    def process_text_input(self, text: str, source_language: str, target_language: str, character: str) -> Dict[str, Any]:
+    def process_text_input(self, text: str, source_language: str, target_language: str, character: str,
+                           session_key: Optional[str] = None, pipeline: Optional[str] = None) -> Dict[str, Any]:
         """
         Process text input and generate a spoken response.
         
@@ -158,13 +333,17 @@ class IntegratedVoiceSystem:
             source_language (str): Source language of the input
             target_language (str): Target language for the response
             character (str): Character to use for TTS
+            session_key (Optional[str]): Per-user conversation key; turns with the same key share history
+            pipeline (Optional[str]): "translate" or "direct" (model answers in the target language); None for the default
             
         Returns:
             Dict[str, Any]: Result of the operation
         """
         try:
             # Process the text input using the voice assistant
-            response_text = self.voice_assistant.process_text_input(text, source_language, target_language)
+            response_text = self.voice_assistant.process_text_input(
+                text, source_language, target_language, session_key, pipeline
+            )
             
             # Generate speech from the response
             timestamp = int(time.time())
@@ -192,6 +371,23 @@ class IntegratedVoiceSystem:
                 "error": str(e)
             }
     
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Collect runtime counters from the pipeline components.
+        
+        Returns:
+            Dict[str, Any]: Metrics grouped by component
+        """
+        return {
+            "transcription_cache": self.voice_assistant.speech_handler.cache.stats(),
+            "translation_cache": self.voice_assistant.translation_handler.cache.stats(),
+            "language_detection": self.voice_assistant.translation_handler.detection_stats(),
+            "translation_upstream": self.voice_assistant.translation_handler.upstream.stats(),
+            "speech_backends": self.voice_assistant.speech_handler.router.stats(),
+            "model": self.voice_assistant.model_handler.stats(),
+            "pipelines": self.voice_assistant.pipeline_stats()
+        }
+    
     def get_characters_data(self) -> Dict[str, Dict[str, Any]]:
         """
         Get character data for the UI.
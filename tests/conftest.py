@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+
+# The application modules are flat top-level modules (as app.py imports them)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+@pytest.fixture(scope="session")
+def app_module(tmp_path_factory):
+    """The Flask app module, imported from a scratch directory so its logs and databases stay out of the tree"""
+    previous = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("app"))
+    os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+    try:
+        import app
+        yield app
+    finally:
+        os.chdir(previous)
+
+
+@pytest.fixture
+def poller(monkeypatch):
+    """A fresh process-wide TranscriptionPoller whose status requests fail the test"""
+    import gladia_api
+
+    poller = gladia_api.TranscriptionPoller(timeout=5)
+    monkeypatch.setattr(gladia_api, "_poller", poller)
+
+    def no_polling(job_id):
+        raise AssertionError(f"job {job_id} was polled instead of resolved by its callback")
+
+    monkeypatch.setattr(gladia_api, "fetch_transcription", no_polling)
+    return poller
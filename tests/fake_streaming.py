@@ -0,0 +1,40 @@
+"""Scripted stand-in for a streaming speech-to-text backend"""
+from typing import Callable, List, Optional
+
+from streaming_stt import STREAM_SAMPLE_RATE, StreamingSTTBackend, TranscriptEvent
+
+
+class ScriptedStreamingBackend(StreamingSTTBackend):
+    """
+    Emits a fixed script of transcript events instead of recognizing speech.
+
+    Each audio chunk releases the next event, as a real engine would produce
+    a partial or final transcript while audio arrives; finish() flushes the
+    rest of the script.
+    """
+
+    def __init__(self, script: List[TranscriptEvent]):
+        self.script = list(script)
+        self.audio: List[bytes] = []
+        self.started_with: Optional[dict] = None
+        self.finished = False
+        self.closed = False
+        self._on_transcript: Optional[Callable[[TranscriptEvent], None]] = None
+
+    def start(self, on_transcript: Callable[[TranscriptEvent], None],
+              sample_rate: int = STREAM_SAMPLE_RATE, language: Optional[str] = None) -> None:
+        self._on_transcript = on_transcript
+        self.started_with = {"sample_rate": sample_rate, "language": language}
+
+    def send_audio(self, chunk: bytes) -> None:
+        self.audio.append(chunk)
+        if self.script:
+            self._on_transcript(self.script.pop(0))
+
+    def finish(self, timeout: float = 10) -> None:
+        self.finished = True
+        while self.script:
+            self._on_transcript(self.script.pop(0))
+
+    def close(self) -> None:
+        self.closed = True
@@ -0,0 +1,114 @@
+"""Local stand-in for the Gladia v2 pre-recorded API, served by aiohttp on 127.0.0.1"""
+import asyncio
+from collections import Counter
+
+import aiohttp
+from aiohttp import web
+
+import gladia_api
+
+
+class MockGladiaServer:
+    """
+    Serves upload, transcription and status endpoints like api.gladia.io/v2.
+
+    Jobs report "processing" for `processing_polls` status requests, then
+    "done" with the transcript "transcript of <uploaded file name>". Jobs
+    requested with a callback are instead completed by POSTing the result to
+    the callback URL. The server also hosts /gladia/callback, which hands
+    callbacks to gladia_api.handle_callback as the Flask route does.
+    """
+
+    def __init__(self, processing_polls=1, callback_delay=0.05):
+        self.processing_polls = processing_polls
+        self.callback_delay = callback_delay
+        self.jobs = {}
+        self.transcription_requests = []
+        self.status_polls = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.base_url = None
+        self._runner = None
+        self._tasks = set()
+
+    @property
+    def upload_url(self):
+        return f"{self.base_url}/v2/upload"
+
+    @property
+    def transcription_url(self):
+        return f"{self.base_url}/v2/transcription"
+
+    @property
+    def callback_url(self):
+        return f"{self.base_url}/gladia/callback"
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/v2/upload", self._upload)
+        app.router.add_post("/v2/transcription", self._request_transcription)
+        app.router.add_get("/v2/transcription/{job_id}", self._status)
+        app.router.add_post("/gladia/callback", self._receive_callback)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.base_url = f"http://{host}:{port}"
+        return self
+
+    async def close(self):
+        for task in list(self._tasks):
+            await task
+        await self._runner.cleanup()
+
+    def _result(self, job_id):
+        transcript = f"transcript of {self.jobs[job_id]['filename']}"
+        return {"transcription": {"full_transcript": transcript, "languages": ["en"],
+                                  "utterances": [{"text": transcript, "language": "en"}]}}
+
+    def _finish(self, job_id):
+        if not self.jobs[job_id]["finished"]:
+            self.jobs[job_id]["finished"] = True
+            self.in_flight -= 1
+
+    async def _upload(self, request):
+        assert request.headers.get("x-gladia-key")
+        form = await request.post()
+        audio = form["audio"]
+        return web.json_response({"audio_url": f"{self.base_url}/audio/{audio.filename}"})
+
+    async def _request_transcription(self, request):
+        body = await request.json()
+        self.transcription_requests.append(body)
+        job_id = f"job-{len(self.transcription_requests)}"
+        self.jobs[job_id] = {"filename": body["audio_url"].rsplit("/", 1)[-1], "finished": False}
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        if body.get("callback"):
+            task = asyncio.ensure_future(self._send_callback(body["callback_config"]["url"], job_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return web.json_response({"id": job_id, "result_url": f"{self.transcription_url}/{job_id}"})
+
+    async def _status(self, request):
+        job_id = request.match_info["job_id"]
+        if job_id not in self.jobs:
+            return web.json_response({"message": "not found"}, status=404)
+        self.status_polls[job_id] += 1
+        if self.status_polls[job_id] <= self.processing_polls:
+            return web.json_response({"id": job_id, "status": "processing"})
+        self._finish(job_id)
+        return web.json_response({"id": job_id, "status": "done", "result": self._result(job_id)})
+
+    async def _send_callback(self, url, job_id):
+        await asyncio.sleep(self.callback_delay)
+        self._finish(job_id)
+        payload = {"id": job_id, "event": "transcription.success", "payload": self._result(job_id)}
+        async with aiohttp.ClientSession() as session:
+            async with session.post(url, json=payload) as response:
+                response.raise_for_status()
+
+    async def _receive_callback(self, request):
+        job_id = gladia_api.handle_callback(await request.json())
+        return web.json_response({"success": bool(job_id), "id": job_id})
@@ -0,0 +1,79 @@
+import os
+import shutil
+import time
+import wave
+
+import pytest
+
+from audio_preprocessing import AudioPreprocessor
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="pydub needs ffmpeg to encode")
+
+
+def write_wav(path, seconds, rate=44100, channels=2):
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(b"\x10\x00" * int(seconds * rate * channels))
+    return str(path)
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    path = tmp_path / "preprocessed"
+    path.mkdir()
+    return path
+
+
+def wait_for_empty(directory, timeout=30):
+    deadline = time.monotonic() + timeout
+    while os.listdir(directory) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return os.listdir(directory)
+
+
+def test_failure_falls_back_to_the_original_and_leaves_no_output(tmp_path, output_dir):
+    preprocessor = AudioPreprocessor(workers=1, output_dir=str(output_dir))
+    try:
+        missing = str(tmp_path / "missing.wav")
+        assert preprocessor.preprocess(missing) == missing
+        assert wait_for_empty(output_dir) == []
+    finally:
+        preprocessor.shutdown()
+
+
+def test_output_paths_are_unique(tmp_path, output_dir):
+    preprocessor = AudioPreprocessor(workers=1, output_dir=str(output_dir))
+    try:
+        recording = str(tmp_path / "clip.wav")
+        first, second = preprocessor.output_path_for(recording), preprocessor.output_path_for(recording)
+        assert first != second
+        assert os.path.dirname(first) == str(output_dir)
+    finally:
+        preprocessor.shutdown()
+
+
+@needs_ffmpeg
+def test_preprocess_writes_into_the_output_dir(tmp_path, output_dir):
+    preprocessor = AudioPreprocessor(workers=1, output_dir=str(output_dir))
+    try:
+        recording = write_wav(tmp_path / "clip.wav", seconds=1)
+        result = preprocessor.preprocess(recording)
+        assert result != recording
+        assert os.path.dirname(result) == str(output_dir)
+        assert os.path.getsize(result) < os.path.getsize(recording)
+    finally:
+        preprocessor.shutdown()
+
+
+@needs_ffmpeg
+def test_late_output_after_timeout_is_deleted(tmp_path, output_dir):
+    preprocessor = AudioPreprocessor(workers=1, output_dir=str(output_dir), timeout=0.01)
+    try:
+        recording = write_wav(tmp_path / "long.wav", seconds=120)
+        assert preprocessor.preprocess(recording) == recording
+        # The worker finishes after the caller gave up; its file is removed once it does
+        assert wait_for_empty(output_dir) == []
+    finally:
+        preprocessor.shutdown()
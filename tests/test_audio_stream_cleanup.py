@@ -0,0 +1,25 @@
+import glob
+import io
+
+from werkzeug.test import EnvironBuilder
+
+
+def test_upload_is_removed_when_the_client_leaves_before_streaming(app_module, monkeypatch):
+    def never_streamed(*args):
+        raise AssertionError("the stream was never read")
+        yield
+
+    monkeypatch.setattr(app_module.voice_system, "process_audio_stream", never_streamed)
+    app = app_module.app
+    cookie = app.session_interface.get_signing_serializer(app).dumps({"user_id": 7, "session_id": "cleanup-test"})
+    environ = EnvironBuilder(path="/process_audio_stream", method="POST", headers={"Cookie": f"session={cookie}"},
+                             data={"audio": (io.BytesIO(b"RIFF"), "clip.wav")}).get_environ()
+
+    statuses = []
+    # Called as a WSGI server would, without reading the body: the client disconnected straight away
+    body = app(environ, lambda status, headers: statuses.append(status))
+    assert statuses == ["200 OK"]
+    assert glob.glob("temp_cleanup-test_*.wav")
+
+    body.close()
+    assert glob.glob("temp_cleanup-test_*.wav") == []
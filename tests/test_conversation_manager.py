@@ -0,0 +1,61 @@
+import pytest
+
+from assistant import ConversationManager
+from conversation_store import MAX_READ_MESSAGES, create_conversation_store
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return create_conversation_store("sqlite", db_path=str(tmp_path / "conversations.db"))
+    return create_conversation_store("memory")
+
+
+def drain_summaries(manager):
+    # The summary executor has one worker, so this runs after every queued summary job
+    manager._summary_executor.submit(lambda: None).result(timeout=10)
+
+
+def test_many_short_turns_stay_in_the_window_and_reach_the_summarizer(store):
+    summarized = []
+
+    def summarizer(dropped, previous):
+        summarized.extend(message["content"] for message in dropped)
+        return f"{len(summarized)} messages summarized"
+
+    manager = ConversationManager(token_budget=100000, summarizer=summarizer, store=store)
+    session_id = manager.create_session()
+    turns = 500
+    for turn in range(turns):
+        manager.add_message(session_id, "user", f"q{turn}")
+        manager.add_message(session_id, "assistant", f"a{turn}")
+        manager.trim_conversation(session_id)
+    drain_summaries(manager)
+
+    _, live = store.messages(session_id, limit=None)
+    assert len(live) <= MAX_READ_MESSAGES
+    assert live[0]["role"] == "user"
+    assert live[-1]["content"] == f"a{turns - 1}"
+
+    # Every message is either still in the history or went through the summarizer, in order
+    assert summarized + [message["content"] for message in live] == \
+        [text for turn in range(turns) for text in (f"q{turn}", f"a{turn}")]
+
+    conversation = manager.get_conversation(session_id)
+    assert conversation[1]["content"].endswith(f"{len(summarized)} messages summarized")
+    assert conversation[2:] == live
+
+
+def test_token_budget_trims_oldest_turns(store):
+    manager = ConversationManager(token_budget=40, store=store)
+    session_id = manager.create_session()
+    for turn in range(10):
+        manager.add_message(session_id, "user", f"question number {turn} " * 4)
+        manager.add_message(session_id, "assistant", f"answer number {turn} " * 4)
+        manager.trim_conversation(session_id)
+
+    conversation = manager.get_conversation(session_id)
+    assert conversation[0]["role"] == "system"
+    assert conversation[1]["role"] == "user"
+    assert conversation[-1]["content"].startswith("answer number 9")
+    assert len(conversation) < 21
@@ -0,0 +1,84 @@
+import asyncio
+import wave
+
+import pytest
+
+import gladia_async
+from gladia_mock import MockGladiaServer
+
+
+def write_wav(path, seconds=0.5, rate=16000):
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(b"\x00\x00" * int(seconds * rate))
+    return str(path)
+
+
+@pytest.fixture
+def audio_files(tmp_path):
+    return [write_wav(tmp_path / f"clip{i}.wav") for i in range(5)]
+
+
+@pytest.fixture
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(gladia_async, "initial_poll_delay", lambda audio_duration=None: 0.01)
+    monkeypatch.setattr(gladia_async, "next_poll_delay", lambda previous_delay: 0.01)
+
+
+def run_against_mock(monkeypatch, scenario, **server_options):
+    """Run scenario(server) on a fresh event loop with the async client pointed at a MockGladiaServer"""
+
+    async def main():
+        server = await MockGladiaServer(**server_options).start()
+        monkeypatch.setattr(gladia_async, "UPLOAD_URL", server.upload_url)
+        monkeypatch.setattr(gladia_async, "TRANSCRIPTION_URL", server.transcription_url)
+        try:
+            return server, await scenario(server)
+        finally:
+            await gladia_async.close_session()
+            await server.close()
+
+    return asyncio.run(main())
+
+
+def test_transcribe_audio_async_polls_until_done(monkeypatch, fast_polling, audio_files):
+    server, result = run_against_mock(
+        monkeypatch, lambda server: gladia_async.transcribe_audio_async(audio_files[0]), processing_polls=2)
+
+    assert result == ("transcript of clip0.wav", "en")
+    assert server.status_polls == {"job-1": 3}
+    assert server.transcription_requests[0]["detect_language"] is True
+    assert "callback" not in server.transcription_requests[0]
+
+
+def test_transcribe_many_async_bounds_concurrency(monkeypatch, fast_polling, audio_files):
+    server, results = run_against_mock(
+        monkeypatch, lambda server: gladia_async.transcribe_many_async(audio_files, max_concurrency=2),
+        processing_polls=3)
+
+    assert results == {path: (f"transcript of {path.rsplit('/', 1)[-1]}", "en") for path in audio_files}
+    assert len(server.transcription_requests) == len(audio_files)
+    assert server.max_in_flight <= 2
+
+
+def test_transcribe_audio_async_completes_from_callback(monkeypatch, poller, audio_files):
+    async def scenario(server):
+        return await gladia_async.transcribe_audio_async(audio_files[1], callback_url=server.callback_url)
+
+    server, result = run_against_mock(monkeypatch, scenario)
+
+    assert result == ("transcript of clip1.wav", "en")
+    assert server.transcription_requests[0]["callback_config"]["url"].endswith("/gladia/callback")
+    # Neither the async client nor the shared poller asked for the job's status
+    assert server.status_polls == {}
+    assert poller.pending() == 0
+
+
+def test_failed_upload_returns_none(monkeypatch, fast_polling, tmp_path):
+    missing = str(tmp_path / "missing.wav")
+    server, result = run_against_mock(monkeypatch, lambda server: gladia_async.transcribe_audio_async(missing))
+
+    assert result == (None, None)
+    assert server.transcription_requests == []
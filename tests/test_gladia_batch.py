@@ -0,0 +1,77 @@
+import json
+import threading
+import time
+
+import pytest
+
+import gladia_api
+
+
+class StubTranscriber:
+    """Stands in for transcribe_audio, recording calls and how many overlap"""
+
+    def __init__(self, failing=(), delay=0.05):
+        self.failing = set(failing)
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, path):
+        with self._lock:
+            self.calls.append(path)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if path in self.failing:
+                return None, None
+            return f"text of {path}", "en"
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    transcriber = StubTranscriber()
+    monkeypatch.setattr(gladia_api, "transcribe_audio", transcriber)
+    return transcriber
+
+
+def test_transcribe_many_respects_max_concurrency(stub):
+    paths = [f"clip{index}.wav" for index in range(9)]
+    results = gladia_api.transcribe_many(paths, max_concurrency=3)
+
+    assert results == {path: (f"text of {path}", "en") for path in paths}
+    assert sorted(stub.calls) == sorted(paths)
+    assert stub.max_active == 3
+
+
+def test_transcribe_directory_resumes_from_manifest(tmp_path, stub):
+    for name in ("a.wav", "b.wav", "c.mp3", "notes.txt"):
+        (tmp_path / name).write_bytes(b"")
+    a, b, c = (str(tmp_path / name) for name in ("a.wav", "b.wav", "c.mp3"))
+    manifest = tmp_path / "manifest.jsonl"
+
+    stub.failing = {b}
+    assert gladia_api.transcribe_directory(str(tmp_path), str(manifest), max_concurrency=2) == (2, 1)
+    assert sorted(stub.calls) == [a, b, c]
+
+    # Second run: only the failed file is retried; the successes are read from the manifest
+    stub.calls.clear()
+    stub.failing = set()
+    assert gladia_api.transcribe_directory(str(tmp_path), str(manifest), max_concurrency=2) == (1, 0)
+    assert stub.calls == [b]
+
+    completed = gladia_api.load_manifest(str(manifest))
+    assert sorted(completed) == [a, b, c]
+    assert completed[b]["transcript"] == f"text of {b}"
+    entries = [json.loads(line) for line in manifest.read_text(encoding="utf-8").splitlines()]
+    assert [entry["path"] for entry in entries if not entry["transcript"]] == [b]
+
+    # Nothing left to do on a third run
+    stub.calls.clear()
+    assert gladia_api.transcribe_directory(str(tmp_path), str(manifest)) == (0, 0)
+    assert stub.calls == []
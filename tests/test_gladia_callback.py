@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+import gladia_api
+
+SECRET = "callback-secret"
+
+
+@pytest.fixture
+def client(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "GLADIA_CALLBACK_SECRET", SECRET)
+    return app_module.app.test_client()
+
+
+def callback_payload(job_id, transcript="bonjour tout le monde"):
+    return {
+        "id": job_id,
+        "event": "transcription.success",
+        "payload": {"transcription": {"full_transcript": transcript, "languages": ["fr"]}},
+    }
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        time.sleep(0.01)
+
+
+def test_callback_resolves_waiting_status_check(poller, client):
+    results = {}
+    waiter = threading.Thread(
+        target=lambda: results.update(job=gladia_api.check_transcription_status("job-1", callback=True)))
+    waiter.start()
+    wait_until(lambda: poller.pending() == 1)
+
+    response = client.post(f"/gladia/callback?token={SECRET}", json=callback_payload("job-1"))
+    assert response.status_code == 200
+    assert response.get_json() == {"success": True, "id": "job-1"}
+
+    waiter.join(timeout=2)
+    assert not waiter.is_alive()
+    transcript, _ = gladia_api.extract_transcription(results["job"])
+    assert transcript == "bonjour tout le monde"
+    assert poller.pending() == 0
+
+
+def test_callback_before_submit_is_kept_for_the_waiting_request(poller, client):
+    # Gladia can call back before request_transcription has returned the job id
+    response = client.post(f"/gladia/callback?token={SECRET}", json=callback_payload("job-2", "hola"))
+    assert response.status_code == 200
+    assert poller.pending() == 0
+
+    result = gladia_api.check_transcription_status("job-2", callback=True)
+    assert gladia_api.extract_transcription(result)[0] == "hola"
+
+
+def test_resolve_before_submit_completes_the_future(poller):
+    assert poller.resolve("job-3", {"status": "done"}) is False
+    future = poller.submit("job-3", first_delay=gladia_api.CALLBACK_FALLBACK_DELAY)
+    assert future.done() and future.result() == {"status": "done"}
+    # The early result is consumed, not replayed for a later job with the same id
+    assert "job-3" not in poller._early_results
+
+
+def test_failed_callback_resolves_to_none(poller, client):
+    results = {}
+    waiter = threading.Thread(
+        target=lambda: results.update(job=gladia_api.check_transcription_status("job-4", callback=True)))
+    waiter.start()
+    wait_until(lambda: poller.pending() == 1)
+
+    response = client.post(f"/gladia/callback?token={SECRET}",
+                           json={"id": "job-4", "event": "transcription.error", "error_code": 500})
+    assert response.status_code == 200
+    waiter.join(timeout=2)
+    assert results["job"] is None
+
+
+@pytest.mark.parametrize("query", ["", "?token=wrong", "?token="])
+def test_callback_with_bad_token_is_rejected(poller, client, query):
+    response = client.post(f"/gladia/callback{query}", json=callback_payload("job-5"))
+    assert response.status_code == 403
+    assert "job-5" not in poller._early_results
+
+
+def test_callbacks_are_rejected_without_a_configured_secret(poller, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "GLADIA_CALLBACK_SECRET", None)
+    response = app_module.app.test_client().post("/gladia/callback?token=anything",
+                                                 json=callback_payload("job-6"))
+    assert response.status_code == 403
+    assert "job-6" not in poller._early_results
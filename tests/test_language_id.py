@@ -0,0 +1,37 @@
+import pytest
+
+from assistant import TranslationHandler
+from cache import TieredCache
+from language_id import LocalLanguageIdentifier
+
+
+@pytest.fixture(scope="module")
+def identifier():
+    # Loading langid's model takes a few seconds; share one identifier across the module
+    return LocalLanguageIdentifier()
+
+
+def test_langid_is_installed(identifier):
+    assert identifier.available()
+
+
+@pytest.mark.parametrize("text, language", [
+    ("Bonjour, comment allez-vous aujourd'hui ?", "fr"),
+    ("¿Dónde está la estación de tren más cercana?", "es"),
+    ("What time does the museum open tomorrow?", "en"),
+])
+def test_identify(identifier, text, language):
+    code, probability = identifier.identify(text)
+    assert code == language
+    assert 0 <= probability <= 1
+
+
+def test_confident_detection_skips_the_remote_detector(identifier, monkeypatch):
+    handler = TranslationHandler(cache=TieredCache("translations"), language_identifier=identifier)
+
+    def remote_detect(text):
+        raise AssertionError("googletrans detect() was called")
+
+    monkeypatch.setattr(handler.translator, "detect", remote_detect)
+    assert handler.detect_language("Bonjour, comment allez-vous aujourd'hui ?") == "fr"
+    assert handler.detection_stats()["local"] == 1
@@ -0,0 +1,156 @@
+import json
+import threading
+
+import pytest
+
+import streaming_stt
+from fake_streaming import ScriptedStreamingBackend
+from streaming_stt import LiveTranscriptionSession, TranscriptEvent
+
+SCRIPT = [
+    TranscriptEvent("bonjour", False, "fr"),
+    TranscriptEvent("bonjour à tous", True, "fr"),
+    TranscriptEvent("comment", False, "fr"),
+    TranscriptEvent("comment ça va", True, "fr"),
+]
+
+
+def test_session_forwards_partials_and_queues_finals():
+    sent = []
+    backend = ScriptedStreamingBackend(SCRIPT)
+    live = LiveTranscriptionSession(sent.append, backend=backend)
+    live.start(sample_rate=8000)
+
+    live.send_audio(b"\x00" * 320)
+    assert sent == [{"type": "partial", "text": "bonjour", "language": "fr"}]
+    assert live.next_final() is None
+
+    live.send_audio(b"\x00" * 320)
+    assert live.next_final().text == "bonjour à tous"
+
+    live.finish()
+    assert [event["type"] for event in sent] == ["partial", "final", "partial", "final"]
+    assert live.next_final().text == "comment ça va"
+    assert live.next_final() is None
+    assert backend.started_with == {"sample_rate": 8000, "language": None}
+
+    live.close()
+    assert backend.closed
+
+
+@pytest.fixture
+def live_server(app_module, monkeypatch):
+    """The Flask app on a local port, with the scripted backend and a recorded assistant"""
+    from werkzeug.serving import make_server
+
+    backends = []
+
+    def scripted_backend():
+        backends.append(ScriptedStreamingBackend(SCRIPT))
+        return backends[-1]
+
+    monkeypatch.setitem(streaming_stt.STREAMING_BACKENDS, "scripted", scripted_backend)
+    monkeypatch.setattr(streaming_stt, "STREAMING_BACKEND", "scripted")
+
+    calls = []
+
+    def process_transcript_sync(*args):
+        calls.append(args)
+        return {"success": True, "response_text": f"reply to {args[0]}"}
+
+    monkeypatch.setattr(app_module.voice_system, "process_transcript_sync", process_transcript_sync)
+
+    server = make_server("127.0.0.1", 0, app_module.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server, calls, backends
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+def test_live_websocket_answers_each_final_transcript(app_module, live_server):
+    import websocket
+
+    server, calls, backends = live_server
+    # A signed session cookie for a logged-in user, as the login route would set it
+    cookie = app_module.app.session_interface.get_signing_serializer(app_module.app).dumps({"user_id": 7})
+    ws = websocket.create_connection(f"ws://127.0.0.1:{server.server_port}/ws/live",
+                                     header=[f"Cookie: session={cookie}"], timeout=5)
+    try:
+        ws.send(json.dumps({"language": "Spanish", "character": "Monika", "pipeline": "direct"}))
+        assert json.loads(ws.recv()) == {"type": "ready"}
+
+        events = []
+        for _ in range(2):
+            ws.send_binary(b"\x00" * 640)
+        while len([event for event in events if event["type"] == "response"]) < 1:
+            events.append(json.loads(ws.recv()))
+
+        ws.send(json.dumps({"type": "stop"}))
+        while len([event for event in events if event["type"] == "response"]) < 2:
+            events.append(json.loads(ws.recv()))
+    finally:
+        ws.close()
+
+    assert calls == [
+        ("bonjour à tous", "fr", "Spanish", "Monika", "user:7", "direct"),
+        ("comment ça va", "fr", "Spanish", "Monika", "user:7", "direct"),
+    ]
+    assert [event["type"] for event in events] == [
+        "partial", "final", "processing", "response", "partial", "final", "processing", "response"]
+    assert events[3]["response_text"] == "reply to bonjour à tous"
+    assert backends[0].finished
+
+
+def _connect(app_module, server):
+    import websocket
+
+    cookie = app_module.app.session_interface.get_signing_serializer(app_module.app).dumps({"user_id": 7})
+    return websocket.create_connection(f"ws://127.0.0.1:{server.server_port}/ws/live",
+                                       header=[f"Cookie: session={cookie}"], timeout=5)
+
+
+def test_live_websocket_keeps_relaying_audio_while_answering(app_module, live_server, monkeypatch):
+    server, calls, backends = live_server
+    release = threading.Event()
+
+    def slow_answer(*args):
+        calls.append(args)
+        release.wait(5)
+        return {"success": True, "response_text": f"reply to {args[0]}"}
+
+    monkeypatch.setattr(app_module.voice_system, "process_transcript_sync", slow_answer)
+
+    ws = _connect(app_module, server)
+    try:
+        ws.send(json.dumps({"language": "Spanish"}))
+        assert json.loads(ws.recv()) == {"type": "ready"}
+
+        ws.send_binary(b"\x00" * 640)
+        ws.send_binary(b"\x00" * 640)
+        events = [json.loads(ws.recv()) for _ in range(3)]
+        assert [event["type"] for event in events] == ["partial", "final", "processing"]
+
+        # The first answer is still running, yet the next frame reaches the backend
+        ws.send_binary(b"\x00" * 640)
+        assert json.loads(ws.recv()) == {"type": "partial", "text": "comment", "language": "fr"}
+        assert len(backends[0].audio) == 3
+
+        release.set()
+        assert json.loads(ws.recv())["type"] == "response"
+    finally:
+        release.set()
+        ws.close()
+
+
+def test_live_websocket_rejects_non_object_config(app_module, live_server):
+    server, calls, backends = live_server
+    ws = _connect(app_module, server)
+    try:
+        ws.send(json.dumps(["Spanish"]))
+        assert json.loads(ws.recv()) == {"type": "error", "error": "Expected a JSON config message"}
+    finally:
+        ws.close()
+    assert backends == []
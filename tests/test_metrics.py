@@ -0,0 +1,30 @@
+import pytest
+
+
+@pytest.fixture
+def client(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "METRICS_TOKEN", "metrics-secret")
+    return app_module.app.test_client()
+
+
+@pytest.mark.parametrize("headers", [{}, {"Authorization": "Bearer wrong"}, {"Authorization": "metrics-secret"}])
+def test_metrics_require_a_session_or_token(client, headers):
+    assert client.get("/metrics", headers=headers).status_code == 401
+
+
+def test_metrics_with_token(client):
+    response = client.get("/metrics", headers={"Authorization": "Bearer metrics-secret"})
+    assert response.status_code == 200
+    assert "pipelines" in response.get_json()
+
+
+def test_metrics_for_logged_in_user(client):
+    with client.session_transaction() as session:
+        session["user_id"] = 7
+    assert client.get("/metrics").status_code == 200
+
+
+def test_metrics_closed_without_a_configured_token(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "METRICS_TOKEN", None)
+    response = app_module.app.test_client().get("/metrics", headers={"Authorization": "Bearer "})
+    assert response.status_code == 401
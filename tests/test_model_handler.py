@@ -0,0 +1,40 @@
+from assistant import ModelHandler
+from model_router import ModelRouter
+from response_cache import SemanticResponseCache
+
+
+class FakeChat:
+    def __init__(self, model_name, replies):
+        self.model_name = model_name
+        self.replies = replies
+
+    def send_message(self, prompt, generation_config=None, stream=False):
+        self.replies.append((self.model_name, generation_config["temperature"]))
+        return type("Response", (), {"text": f"{self.model_name} at {generation_config['temperature']}"})()
+
+
+def test_response_cache_is_scoped_by_routed_model_and_temperature():
+    replies = []
+
+    class FakeModel:
+        def __init__(self, model_name, **kwargs):
+            self.model_name = model_name
+
+        def start_chat(self, history):
+            return FakeChat(self.model_name, replies)
+
+    handler = ModelHandler("test-key", model="large", model_factory=FakeModel,
+                           router=ModelRouter(fast_model="fast", large_model="large"))
+    handler.response_cache = SemanticResponseCache()
+
+    def ask(question, temperature=0.7):
+        return handler.generate_response([{"role": "system", "content": "profile"},
+                                          {"role": "user", "content": question}], temperature=temperature)
+
+    assert ask("hello there") == "fast at 0.7"
+    assert ask("hello there") == "fast at 0.7"
+    assert ask("hello there", temperature=0.2) == "fast at 0.2"
+    assert replies == [("fast", 0.7), ("fast", 0.2)]
+    # Scoped by the model the turn is routed to, not the handler's default model
+    messages = [{"role": "system", "content": "profile"}, {"role": "user", "content": "hello there"}]
+    assert handler._response_scope(messages, 0.7).startswith("fast:0.7:")
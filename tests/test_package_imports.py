@@ -0,0 +1,32 @@
+import os
+import sys
+import subprocess
+
+import gladia_api
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loads the repo as a package named gladia_package, without the repo itself on sys.path,
+# so flat sibling imports inside the package would fail
+PACKAGE_IMPORT = """
+import importlib.util, sys
+root = sys.argv[1]
+spec = importlib.util.spec_from_file_location(
+    "gladia_package", root + "/__init__.py", submodule_search_locations=[root])
+module = importlib.util.module_from_spec(spec)
+sys.modules["gladia_package"] = module
+spec.loader.exec_module(module)
+from gladia_package import transcribe_many, transcribe_many_async
+assert "transcribe_many" in module.__all__
+"""
+
+
+def test_package_exports_transcribe_many(tmp_path):
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONPATH"}
+    result = subprocess.run([sys.executable, "-c", PACKAGE_IMPORT, ROOT],
+                            cwd=tmp_path, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_flat_module_exports_transcribe_many():
+    assert callable(gladia_api.transcribe_many)
@@ -0,0 +1,21 @@
+def test_direct_and_translate_pipelines_keep_separate_histories(app_module, monkeypatch):
+    assistant = app_module.voice_system.voice_assistant
+    conversations = []
+
+    def generate_response(messages, temperature=0.7, session_id=None):
+        conversations.append([dict(message) for message in messages])
+        return f"reply {len(conversations)}"
+
+    monkeypatch.setattr(assistant.model_handler, "generate_response", generate_response)
+
+    assistant.process_text_input("hola", "es", "Spanish", session_key="user:pipelines", pipeline="direct")
+    assistant.process_text_input("hello", "en", "en", session_key="user:pipelines", pipeline="translate")
+
+    direct, translate = conversations
+    # The reply-language instruction is part of the system instruction, not a second system message
+    assert [message["role"] for message in direct] == ["system", "user"]
+    assert direct[0]["content"].startswith(assistant.character_profile)
+    assert direct[0]["content"].endswith("Always reply in Spanish, whatever language the user writes in.")
+    # The translate turn does not see the untranslated direct-mode history
+    assert translate[1:] == [{"role": "user", "content": "hello"}]
+    assert translate[0]["content"] == assistant.character_profile
@@ -0,0 +1,62 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from resilience import CircuitBreaker, CircuitOpenError, ResilientCaller
+
+
+def test_hedging_is_opt_in():
+    assert ResilientCaller("upstream").hedge is False
+
+
+def test_queueing_in_a_busy_executor_does_not_trigger_hedges():
+    # No hedge budget limit, so only the hedge delay decides
+    caller = ResilientCaller("upstream", hedge=True, max_workers=8, hedge_budget=1.0)
+    for _ in range(30):
+        caller.latency.record(0.15)  # a healthy upstream: p95 just above its 100 ms calls
+
+    def healthy(_):
+        time.sleep(0.1)
+        return "ok"
+
+    with ThreadPoolExecutor(max_workers=24) as clients:
+        assert list(clients.map(lambda i: caller.call(healthy, i), range(24))) == ["ok"] * 24
+    # Calls waited in the executor queue, but every attempt ran within its normal latency
+    assert caller.stats()["hedged"] == 0
+
+
+def test_hedges_are_capped_by_the_budget(monkeypatch):
+    caller = ResilientCaller("upstream", hedge=True, hedge_budget=0.1)
+    monkeypatch.setattr(caller, "hedge_delay", lambda: 0.01)  # every call runs past it
+
+    for _ in range(20):
+        assert caller.call(time.sleep, 0.05) is None
+    stats = caller.stats()
+    assert stats["hedged"] == 2  # one per ten calls
+    assert stats["hedges_over_budget"] == 18
+
+
+def test_call_is_bounded_by_its_timeout():
+    release = threading.Event()
+    caller = ResilientCaller("upstream", timeout=0.1)
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        caller.call(release.wait, 5)
+    assert time.monotonic() - start < 1
+    assert caller.stats()["timeouts"] == 1
+    release.set()
+
+
+def test_breaker_opens_after_failures():
+    caller = ResilientCaller("upstream", CircuitBreaker("upstream", failure_threshold=2, reset_timeout=60))
+
+    def failing():
+        raise ConnectionError("down")
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            caller.call(failing)
+    with pytest.raises(CircuitOpenError):
+        caller.call(failing)
@@ -0,0 +1,89 @@
+import threading
+import time
+import wave
+
+import pytest
+
+from metrics import LatencyStats
+from speech_backends import SpeechBackend, SpeechRouter
+
+
+class StalledRemote(SpeechBackend):
+    """Remote backend whose calls block until released, like a slow Gladia"""
+
+    name = "remote"
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+
+    def transcribe(self, audio_path):
+        self.calls += 1
+        self.release.wait(10)
+        return "remote transcript", "en"
+
+
+class InstantLocal(SpeechBackend):
+    name = "local"
+
+    def transcribe(self, audio_path):
+        return "local transcript", "en"
+
+
+@pytest.fixture
+def clip(tmp_path):
+    path = tmp_path / "clip.wav"
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(b"\x00\x00" * 16000)
+    return str(path)
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        time.sleep(0.01)
+
+
+def test_saturated_remote_routes_straight_to_local(clip):
+    remote = StalledRemote()
+    router = SpeechRouter(remote=remote, local=InstantLocal(), short_clip_seconds=0,
+                          remote_budget=0.05, max_remote_in_flight=2)
+    try:
+        # Two calls time out and fall back; their remote requests keep running
+        for _ in range(2):
+            assert router.transcribe(clip) == ("local transcript", "en")
+        assert router.stats()["remote_in_flight"] == 2
+
+        start = time.perf_counter()
+        assert router.transcribe(clip) == ("local transcript", "en")
+        assert time.perf_counter() - start < 0.05  # did not wait out the remote budget
+        assert remote.calls == 2
+        assert router.stats()["routes"]["remote_saturated"] == 1
+
+        # Once the stalled calls finish, remote routing resumes
+        remote.release.set()
+        wait_until(lambda: router.stats()["remote_in_flight"] == 0)
+        router.latency["remote"] = LatencyStats()  # forget the slow samples so the next call is not over budget
+        assert router.transcribe(clip) == ("remote transcript", "en")
+        assert remote.calls == 3
+    finally:
+        remote.release.set()
+
+
+class FailingRemote(SpeechBackend):
+    name = "remote"
+
+    def transcribe(self, audio_path):
+        raise ConnectionError("Gladia unreachable")
+
+
+def test_remote_error_falls_back_to_local(clip):
+    router = SpeechRouter(remote=FailingRemote(), local=InstantLocal(), short_clip_seconds=0, remote_budget=1)
+    assert router.transcribe(clip) == ("local transcript", "en")
+    stats = router.stats()
+    assert stats["routes"]["remote_error"] == 1
+    wait_until(lambda: router.stats()["remote_in_flight"] == 0)
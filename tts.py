@@ -4,6 +4,7 @@ import time
 import logging
 from pathlib import Path
 from typing import Dict, Any, Optional
+from http_client import get_http_pool
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -25,8 +26,8 @@ class AIVoiceSystem:
             logger.warning("One or both ElevenLabs API keys are missing. Using default keys for development only.")
             # Only use default keys if not in production
             if not os.getenv("PRODUCTION", "False").lower() == "true":
-                self.api_key_1 = self.api_key_1 or ""enter_your_own_api_key""
-                self.api_key_2 = self.api_key_2 or ""enter_your_own_api_key""
+                self.api_key_1 = self.api_key_1 or "enter_your_own_api_key"
+                self.api_key_2 = self.api_key_2 or "enter_your_own_api_key"
             else:
                 raise ValueError("API keys must be provided in production environment")
             
@@ -195,7 +196,7 @@ class AIVoiceSystem:
             try:
                 # Make the API request
                 logger.info(f"Sending TTS request to ElevenLabs API for voice {voice_id}, language {language}")
-                response = requests.post(url, json=data, headers=headers, timeout=30)
+                response = get_http_pool().post(url, json=data, headers=headers)
                 
                 # Check if the request was successful
                 if response.status_code == 200: